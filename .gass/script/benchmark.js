@@ -0,0 +1,507 @@
+#!/usr/bin/env node
+
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const Module = require('module');
+const { spawnSync } = require('child_process');
+const { generatePlan, DEFAULT_OPTIONS: PLAN_DEFAULTS } = require('./generate-plan');
+
+/**
+ * Benchmark suite untuk orchestration scripts
+ *
+ * Untuk setiap ukuran plan:
+ * 1. synthetic plan di-generate ke sandbox baru (<tmp>/.ai/plan, lihat generate-plan.js)
+ * 2. script ini di-copy ke <tmp>/.ai/script, jadi PLAN_DIR, cache, log dan status
+ *    journal semuanya mengarah ke sandbox, bukan ke .ai project
+ * 3. worker process terpisah menjalankan stage berikut dan melapor hasilnya:
+ *    - scan:   getAllLeafTasks() (load plan graph + ready set)
+ *    - find:   find-leaf-phases.js main()
+ *    - update: updateAllPhases('pending')
+ *    - run:    RunTasks.runSingle() end-to-end, dengan query() dari
+ *              @anthropic-ai/claude-agent-sdk diganti fake lokal yang latency nya
+ *              bisa diatur (SDK asli tidak dibutuhkan dan tidak dipanggil)
+ *
+ * Per stage dilaporkan wall time, CPU time, jumlah fs call (proxy syscall,
+ * dihitung dengan membungkus fs module) dan RSS; per plan peak RSS, scheduler
+ * utilization dan makespan. Satu worker per ukuran supaya peak RSS tidak tercampur.
+ *
+ * Usage:
+ *   node benchmark.js
+ *   node benchmark.js --sizes=100,1000 --latency=lognormal:20,0.5 --parallel=10
+ *   node benchmark.js --output=bench.json
+ *   node benchmark.js --baseline=bench.json --threshold=25
+ */
+
+const DEFAULT_SIZES = [100, 1000, 10000, 50000];
+const DEFAULT_LATENCY = 'uniform:1-5';
+const DEFAULT_PARALLEL = 5;
+const DEFAULT_THRESHOLD = 25; // persen
+const MIN_COMPARABLE_MS = 5; // Stage lebih cepat dari ini terlalu noisy untuk dibandingkan
+
+const SDK_MODULE = '@anthropic-ai/claude-agent-sdk';
+const RESULT_MARKER = '@@BENCH ';
+const STAGES = [
+  { key: 'scan', label: 'scan (getAllLeafTasks)' },
+  { key: 'find', label: 'find-leaf-phases' },
+  { key: 'update', label: 'updateAllPhases' },
+  { key: 'run', label: 'run (RunTasks)' }
+];
+
+const FS_METHODS = [
+  'readFileSync', 'readdirSync', 'statSync', 'lstatSync', 'existsSync', 'openSync', 'closeSync',
+  'writeFileSync', 'appendFileSync', 'renameSync', 'unlinkSync', 'mkdirSync', 'rmSync',
+  'readFile', 'readdir', 'stat', 'open', 'close', 'write', 'writev', 'rename', 'unlink', 'mkdir'
+];
+
+/**
+ * Latency distribution untuk fake query():
+ *   fixed:MS | uniform:MIN-MAX | lognormal:MEDIAN,SIGMA
+ */
+function createLatencySampler(spec, random = Math.random) {
+  const [type, params = ''] = spec.split(':');
+  const values = params.split(/[-,]/).map(Number);
+
+  if (values.some(value => Number.isNaN(value) || value < 0)) {
+    throw new Error(`Invalid latency "${spec}"`);
+  }
+
+  switch (type) {
+    case 'fixed':
+      return () => values[0];
+    case 'uniform':
+      return () => values[0] + random() * ((values[1] !== undefined ? values[1] : values[0]) - values[0]);
+    case 'lognormal': {
+      // Box-Muller: median * e^(sigma * N(0,1))
+      const [median, sigma = 0.5] = values;
+      return () => {
+        const normal = Math.sqrt(-2 * Math.log(1 - random())) * Math.cos(2 * Math.PI * random());
+        return median * Math.exp(sigma * normal);
+      };
+    }
+    default:
+      throw new Error(`Unknown latency distribution "${type}" (use fixed, uniform or lognormal)`);
+  }
+}
+
+function createFakeSdk(latencySpec) {
+  const sampleLatency = createLatencySampler(latencySpec);
+  const sdk = {
+    calls: 0,
+    query({ prompt }) {
+      sdk.calls++;
+      const latency = sampleLatency();
+
+      // Bentuk stream sama seperti SDK: beberapa message lalu result
+      return (async function* () {
+        await new Promise(resolve => setTimeout(resolve, latency));
+        yield { type: 'assistant', content: `Working on: ${String(prompt).substring(0, 40)}` };
+        yield { type: 'result', content: 'Task complete, hasil valid.' };
+      })();
+    }
+  };
+  return sdk;
+}
+
+/**
+ * Module._load hook: require(SDK_MODULE) dari helpers.js mendapat fake SDK
+ */
+function installFakeSdk(fakeSdk) {
+  const originalLoad = Module._load;
+  Module._load = function (request, parent, isMain) {
+    if (request === SDK_MODULE) {
+      return fakeSdk;
+    }
+    return originalLoad.call(this, request, parent, isMain);
+  };
+}
+
+function installFsCounter() {
+  const counts = new Map();
+
+  FS_METHODS.forEach(method => {
+    const original = fs[method];
+    if (typeof original !== 'function') return;
+
+    counts.set(method, 0);
+    fs[method] = function (...args) {
+      counts.set(method, counts.get(method) + 1);
+      return original.apply(this, args);
+    };
+  });
+
+  return {
+    total: () => Array.from(counts.values()).reduce((sum, count) => sum + count, 0),
+    snapshot: () => new Map(counts)
+  };
+}
+
+function toMb(bytes) {
+  return Math.round(bytes / 1024 / 1024 * 10) / 10;
+}
+
+/**
+ * Worker: dijalankan dari copy script di sandbox, output hasil sebagai satu baris JSON
+ */
+async function runWorker(options) {
+  const fsCounter = installFsCounter();
+  const fakeSdk = createFakeSdk(options.latency);
+  installFakeSdk(fakeSdk);
+
+  const { getAllLeafTasks } = require('./get-leaf-tasks');
+  const findLeafPhases = require('./find-leaf-phases');
+  const { updateAllPhases } = require('./update-phase-status');
+  const { resultCache } = require('./result-cache');
+  const RunTasks = require('./run-tasks');
+
+  // Setiap task harus benar-benar memanggil fake query(), bukan cache
+  resultCache.enabled = false;
+
+  const originalConsole = { log: console.log, warn: console.warn, error: console.error };
+  const result = { stages: {} };
+
+  const measure = async (key, fn) => {
+    if (!options.verbose) {
+      console.log = console.warn = console.error = () => {};
+    }
+
+    const fsBefore = fsCounter.total();
+    const cpuBefore = process.cpuUsage();
+    const startTime = process.hrtime.bigint();
+
+    try {
+      await fn();
+    } finally {
+      Object.assign(console, originalConsole);
+    }
+
+    const cpu = process.cpuUsage(cpuBefore);
+    result.stages[key] = {
+      ms: Number(process.hrtime.bigint() - startTime) / 1e6,
+      cpuMs: (cpu.user + cpu.system) / 1000,
+      fsCalls: fsCounter.total() - fsBefore,
+      rssMb: toMb(process.memoryUsage().rss)
+    };
+  };
+
+  await measure('scan', () => {
+    result.readyTasks = getAllLeafTasks().length;
+  });
+
+  await measure('find', () => findLeafPhases.main());
+
+  await measure('update', () => updateAllPhases('pending'));
+
+  if (!options.skipRun) {
+    const runner = new RunTasks();
+    runner.maxParallel = options.parallel;
+
+    await measure('run', async () => {
+      const { results } = await runner.runSingle({ filter: '' }, Date.now());
+      result.tasks = results.length;
+      result.validated = results.filter(taskResult => taskResult.validationPassed).length;
+    });
+
+    result.scheduler = runner.schedulerStats;
+    result.queryCalls = fakeSdk.calls;
+  }
+
+  result.peakRssMb = toMb(process.resourceUsage().maxRSS * 1024);
+  process.stdout.write(RESULT_MARKER + JSON.stringify(result) + '\n', () => process.exit(0));
+}
+
+/**
+ * Sandbox: <tmp>/.ai/{plan,script}, script = copy dari direktori ini
+ */
+function createSandbox(size, planOptions) {
+  const sandbox = fs.mkdtempSync(path.join(os.tmpdir(), 'plan-bench-'));
+  const aiDir = path.join(sandbox, '.ai');
+  const scriptDir = path.join(aiDir, 'script');
+
+  const plan = generatePlan(path.join(aiDir, 'plan'), { ...planOptions, phases: size });
+
+  fs.mkdirSync(scriptDir, { recursive: true });
+  fs.readdirSync(__dirname)
+    .filter(fileName => fileName.endsWith('.js') || fileName.endsWith('.json'))
+    .forEach(fileName => fs.copyFileSync(path.join(__dirname, fileName), path.join(scriptDir, fileName)));
+
+  const nodeModules = path.join(__dirname, 'node_modules');
+  if (fs.existsSync(nodeModules)) {
+    fs.symlinkSync(nodeModules, path.join(scriptDir, 'node_modules'), 'dir');
+  }
+
+  return { sandbox, scriptDir, plan };
+}
+
+function runScenario(size, options) {
+  const setupStart = Date.now();
+  const { sandbox, scriptDir, plan } = createSandbox(size, options.plan);
+  const generateMs = Date.now() - setupStart;
+
+  try {
+    const workerOptions = {
+      latency: options.latency,
+      parallel: options.parallel,
+      skipRun: options.skipRun,
+      verbose: options.verbose
+    };
+
+    const child = spawnSync(process.execPath, [path.join(scriptDir, 'benchmark.js'), '--worker', JSON.stringify(workerOptions)], {
+      encoding: 'utf8',
+      maxBuffer: 256 * 1024 * 1024,
+      stdio: ['ignore', 'pipe', 'inherit']
+    });
+
+    const resultLine = (child.stdout || '').split('\n').find(line => line.startsWith(RESULT_MARKER));
+    if (child.status !== 0 || !resultLine) {
+      throw new Error(`Benchmark worker for ${size} phases failed (exit code ${child.status})`);
+    }
+    if (options.verbose) {
+      process.stdout.write(child.stdout.split('\n').filter(line => !line.startsWith(RESULT_MARKER)).join('\n'));
+    }
+
+    return { size, plan, generateMs, ...JSON.parse(resultLine.slice(RESULT_MARKER.length)) };
+  } finally {
+    if (options.keep) {
+      console.log(`   Sandbox kept at ${sandbox}`);
+    } else {
+      fs.rmSync(sandbox, { recursive: true, force: true });
+    }
+  }
+}
+
+function formatMs(ms) {
+  return ms >= 1000 ? `${(ms / 1000).toFixed(2)}s` : `${ms.toFixed(1)}ms`;
+}
+
+function printScenario(scenario) {
+  const { plan } = scenario;
+  console.log(`\n📊 ${plan.phases} phases (${plan.leaves} leaves, ${plan.files} files, depth ${plan.depth}) — generated in ${scenario.generateMs}ms`);
+  console.log(`   ${'Stage'.padEnd(24)}${'Wall'.padStart(10)}${'CPU'.padStart(10)}${'fs calls'.padStart(10)}${'RSS'.padStart(10)}`);
+
+  STAGES.forEach(({ key, label }) => {
+    const stage = scenario.stages[key];
+    if (!stage) return;
+    console.log(`   ${label.padEnd(24)}${formatMs(stage.ms).padStart(10)}${formatMs(stage.cpuMs).padStart(10)}${String(stage.fsCalls).padStart(10)}${`${stage.rssMb}MB`.padStart(10)}`);
+  });
+
+  if (scenario.scheduler) {
+    const stats = scenario.scheduler;
+    console.log(`   Scheduler: makespan ${formatMs(stats.makespan)} (critical path ${formatMs(stats.criticalPath)}), utilization ${(stats.utilization * 100).toFixed(1)}%, saturation ${(stats.saturation * 100).toFixed(1)}%`);
+    console.log(`   Tasks: ${scenario.tasks} executed, ${scenario.validated} validated, ${stats.blocked} still blocked, ${scenario.queryCalls} query() calls`);
+  }
+  console.log(`   Peak RSS: ${scenario.peakRssMb}MB, ready tasks at scan: ${scenario.readyTasks}`);
+}
+
+function printSummary(scenarios) {
+  console.log('\n' + '='.repeat(70));
+  console.log('📈 BENCHMARK SUMMARY');
+  console.log('='.repeat(70));
+  console.log(`${'Phases'.padEnd(8)}${'Scan'.padStart(10)}${'Find'.padStart(10)}${'Update'.padStart(10)}${'Makespan'.padStart(11)}${'Util'.padStart(8)}${'Peak RSS'.padStart(11)}`);
+
+  scenarios.forEach(scenario => {
+    const { stages, scheduler } = scenario;
+    console.log(
+      String(scenario.size).padEnd(8) +
+      formatMs(stages.scan.ms).padStart(10) +
+      formatMs(stages.find.ms).padStart(10) +
+      formatMs(stages.update.ms).padStart(10) +
+      (scheduler ? formatMs(scheduler.makespan) : '-').padStart(11) +
+      (scheduler ? `${(scheduler.utilization * 100).toFixed(1)}%` : '-').padStart(8) +
+      `${scenario.peakRssMb}MB`.padStart(11)
+    );
+  });
+  console.log('='.repeat(70));
+}
+
+/**
+ * Bandingkan dengan hasil run sebelumnya (--output), return daftar regression
+ */
+function compareWithBaseline(scenarios, baseline, threshold) {
+  const regressions = [];
+  const baselineBySize = new Map(baseline.scenarios.map(scenario => [scenario.size, scenario]));
+
+  const check = (size, metric, current, previous, minimum = 0) => {
+    if (current === undefined || previous === undefined || previous < minimum) return;
+    const change = previous > 0 ? (current - previous) / previous * 100 : 0;
+    if (change > threshold) {
+      regressions.push({ size, metric, previous, current, change });
+    }
+  };
+
+  scenarios.forEach(scenario => {
+    const previous = baselineBySize.get(scenario.size);
+    if (!previous) return;
+
+    STAGES.forEach(({ key }) => {
+      if (!scenario.stages[key] || !previous.stages[key]) return;
+      check(scenario.size, `${key} time`, scenario.stages[key].ms, previous.stages[key].ms, MIN_COMPARABLE_MS);
+      check(scenario.size, `${key} fs calls`, scenario.stages[key].fsCalls, previous.stages[key].fsCalls);
+    });
+    check(scenario.size, 'peak RSS', scenario.peakRssMb, previous.peakRssMb);
+    if (scenario.scheduler && previous.scheduler) {
+      check(scenario.size, 'makespan', scenario.scheduler.makespan, previous.scheduler.makespan, MIN_COMPARABLE_MS);
+    }
+  });
+
+  return regressions;
+}
+
+function showUsage() {
+  console.log(`
+Usage: node benchmark.js [options]
+
+Options:
+  --sizes=<n,n,...>        Ukuran plan dalam jumlah phase (default: ${DEFAULT_SIZES.join(',')})
+  --latency=<spec>         Latency fake query(): fixed:MS, uniform:MIN-MAX, lognormal:MEDIAN,SIGMA
+                           (default: ${DEFAULT_LATENCY})
+  --parallel=<n>           maxParallel RunTasks (default: ${DEFAULT_PARALLEL})
+  --fan-out=<n>            Sub-phases per phase (default: ${PLAN_DEFAULTS.fanOut})
+  --depth=<n>              Kedalaman plan (default: otomatis)
+  --dep-density=<0-1>      Density dependency antar sibling (default: ${PLAN_DEFAULTS.depDensity})
+  --leaf-file-ratio=<0-1>  Porsi leaf dengan file sendiri (default: ${PLAN_DEFAULTS.leafFileRatio})
+  --seed=<n>               Seed plan generator (default: ${PLAN_DEFAULTS.seed})
+  --skip-run               Hanya benchmark scan/find/update, tanpa scheduler run
+  --output=<file>          Simpan hasil sebagai JSON
+  --baseline=<file>        Bandingkan dengan hasil --output sebelumnya, exit 1 jika ada regression
+  --threshold=<percent>    Batas regression untuk --baseline (default: ${DEFAULT_THRESHOLD})
+  --keep                   Jangan hapus sandbox setelah selesai
+  --verbose                Tampilkan output asli script yang di-benchmark
+  --help                   Tampilkan bantuan ini
+`);
+}
+
+function parseArgs(args) {
+  const options = {
+    sizes: DEFAULT_SIZES,
+    latency: DEFAULT_LATENCY,
+    parallel: DEFAULT_PARALLEL,
+    threshold: DEFAULT_THRESHOLD,
+    plan: {},
+    skipRun: false,
+    keep: false,
+    verbose: false,
+    output: null,
+    baseline: null
+  };
+
+  const planOptions = {
+    '--fan-out': 'fanOut',
+    '--depth': 'depth',
+    '--dep-density': 'depDensity',
+    '--leaf-file-ratio': 'leafFileRatio',
+    '--seed': 'seed'
+  };
+
+  args.forEach(arg => {
+    const [flag, value] = arg.split('=');
+
+    if (flag === '--sizes') {
+      options.sizes = value.split(',').map(size => parseInt(size));
+      if (options.sizes.some(size => !(size > 0))) throw new Error('--sizes must be positive integers');
+    } else if (flag === '--latency') {
+      createLatencySampler(value); // validasi lebih awal, sebelum generate plan
+      options.latency = value;
+    } else if (flag === '--parallel') {
+      options.parallel = parseInt(value);
+    } else if (flag === '--threshold') {
+      options.threshold = Number(value);
+    } else if (flag === '--output' || flag === '--baseline') {
+      options[flag.slice(2)] = path.resolve(value);
+    } else if (flag === '--skip-run') {
+      options.skipRun = true;
+    } else if (flag === '--keep') {
+      options.keep = true;
+    } else if (flag === '--verbose') {
+      options.verbose = true;
+    } else if (planOptions[flag]) {
+      options.plan[planOptions[flag]] = Number(value);
+    } else {
+      throw new Error(`Unknown option: ${arg}`);
+    }
+  });
+
+  return options;
+}
+
+function main() {
+  const args = process.argv.slice(2);
+
+  if (args.includes('--help')) {
+    showUsage();
+    return;
+  }
+
+  let options;
+  try {
+    options = parseArgs(args);
+  } catch (error) {
+    console.error(`Error: ${error.message}`);
+    showUsage();
+    process.exit(1);
+  }
+
+  const baseline = options.baseline ? JSON.parse(fs.readFileSync(options.baseline, 'utf8')) : null;
+
+  console.log('⏱️  Orchestration benchmark');
+  console.log(`   sizes: ${options.sizes.join(', ')} phases, latency: ${options.latency}, maxParallel: ${options.parallel}${options.skipRun ? ', scheduler run skipped' : ''}`);
+
+  const scenarios = [];
+  for (const size of options.sizes) {
+    try {
+      const scenario = runScenario(size, options);
+      scenarios.push(scenario);
+      printScenario(scenario);
+    } catch (error) {
+      console.error(`❌ ${error.message}`);
+      process.exitCode = 1;
+    }
+  }
+
+  if (scenarios.length === 0) return;
+  printSummary(scenarios);
+
+  if (options.output) {
+    const report = {
+      createdAt: new Date().toISOString(),
+      node: process.version,
+      options: { latency: options.latency, parallel: options.parallel, plan: options.plan },
+      scenarios
+    };
+    fs.writeFileSync(options.output, JSON.stringify(report, null, 2), 'utf8');
+    console.log(`💾 Results saved to ${options.output}`);
+  }
+
+  if (baseline) {
+    const regressions = compareWithBaseline(scenarios, baseline, options.threshold);
+    if (regressions.length === 0) {
+      console.log(`✅ No regressions over ${options.threshold}% against ${options.baseline}`);
+    } else {
+      console.log(`\n⚠️  ${regressions.length} regression(s) over ${options.threshold}% against ${options.baseline}:`);
+      regressions.forEach(({ size, metric, previous, current, change }) => {
+        const format = value => (Number.isInteger(value) ? String(value) : value.toFixed(1));
+        console.log(`   ${size} phases, ${metric}: ${format(previous)} → ${format(current)} (+${change.toFixed(1)}%)`);
+      });
+      process.exitCode = 1;
+    }
+  }
+}
+
+if (require.main === module) {
+  const workerIndex = process.argv.indexOf('--worker');
+
+  if (workerIndex !== -1) {
+    runWorker(JSON.parse(process.argv[workerIndex + 1])).catch(error => {
+      console.error(`Benchmark worker error: ${error.stack || error.message}`);
+      process.exit(1);
+    });
+  } else {
+    main();
+  }
+}
+
+module.exports = {
+  createLatencySampler,
+  createFakeSdk,
+  compareWithBaseline
+};
@@ -2,6 +2,7 @@
 
 const fs = require('fs');
 const path = require('path');
+const { loadPlanGraph } = require('./plan-graph');
 
 /**
  * Script untuk mencari leaf phases yang durasinya >60 menit
@@ -70,30 +71,32 @@ function isLeafPhase(filePath, allFiles) {
   });
 }
 
+function summarizePhaseData(filePath, data) {
+  const phases = [];
+
+  if (data.phases && Array.isArray(data.phases)) {
+    data.phases.forEach(phase => {
+      phases.push({
+        id: phase.id || 'undefined',
+        title: phase.title || 'No title',
+        duration: phase.duration || '0',
+        status: phase.status || 'pending'
+      });
+    });
+  }
+
+  return {
+    filePath,
+    fileName: path.basename(filePath),
+    phases,
+    breakdownComplete: data.breakdown_complete || false
+  };
+}
+
 function parsePhaseData(filePath) {
   try {
     const content = fs.readFileSync(filePath, 'utf8');
-    const data = JSON.parse(content);
-
-    const phases = [];
-
-    if (data.phases && Array.isArray(data.phases)) {
-      data.phases.forEach(phase => {
-        phases.push({
-          id: phase.id || 'undefined',
-          title: phase.title || 'No title',
-          duration: phase.duration || '0',
-          status: phase.status || 'pending'
-        });
-      });
-    }
-
-    return {
-      filePath,
-      fileName: path.basename(filePath),
-      phases,
-      breakdownComplete: data.breakdown_complete || false
-    };
+    return summarizePhaseData(filePath, JSON.parse(content));
   } catch (error) {
     console.error(`Error parsing ${filePath}:`, error.message);
     return null;
@@ -105,22 +108,24 @@ function main() {
 
   console.log('🔍 Scanning untuk leaf phases dengan durasi >60 menit...\n');
 
-  // Get all plan files (exclude phases.json)
-  const allFiles = getAllPlanFiles(planDir).filter(file =>
-    !file.endsWith('phases.json')
-  );
-  console.log(`📁 Total files ditemukan: ${allFiles.length}`);
+  // Load semua plan files sekali (exclude phases.json & index.json)
+  const graph = loadPlanGraph(planDir, { recursive: true });
+  const phaseIds = Array.from(graph.files.keys());
+  console.log(`📁 Total files ditemukan: ${phaseIds.length}`);
+
+  // Index parent → child file dalam satu pass, bukan regex per pasangan file
+  const idsWithChildFiles = graph.getPhaseIdsWithChildFiles();
 
   const leafPhases = [];
   const processedFiles = [];
 
-  for (const filePath of allFiles) {
-    const isLeaf = isLeafPhase(filePath, allFiles);
+  for (const phaseId of phaseIds) {
+    const isLeaf = !idsWithChildFiles.has(phaseId);
 
     if (isLeaf) {
-      const phaseData = parsePhaseData(filePath);
+      const phaseData = summarizePhaseData(graph.getFilePath(phaseId), graph.getPhaseData(phaseId));
 
-      if (phaseData && phaseData.phases.length > 0) {
+      if (phaseData.phases.length > 0) {
         processedFiles.push(phaseData);
 
         // Cek setiap phase dalam array [phases]
@@ -186,7 +191,7 @@ function main() {
 
   console.log('\n📈 STATISTICS:');
   console.log('================================');
-  console.log(`Total files scanned: ${allFiles.length}`);
+  console.log(`Total files scanned: ${phaseIds.length}`);
   console.log(`Total leaf files: ${processedFiles.length}`);
   console.log(`Leaf phases with >60min: ${leafPhases.length}`);
 
@@ -208,5 +213,6 @@ module.exports = {
   logDurationCheck,
   getAllPlanFiles,
   isLeafPhase,
-  parsePhaseData
+  parsePhaseData,
+  main
 };
\ No newline at end of file
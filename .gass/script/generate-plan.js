@@ -0,0 +1,278 @@
+#!/usr/bin/env node
+
+const fs = require('fs');
+const path = require('path');
+const { PLAN_DIR } = require('./plan-graph');
+
+/**
+ * Generator synthetic plan tree untuk benchmark (lihat benchmark.js)
+ *
+ * Membuat .ai/plan dengan format yang sama seperti hasil plan-breakdown-analyzer:
+ * - phases.json berisi top-level phases
+ * - {id}.json untuk setiap phase yang punya sub-phases
+ * - leaf phase hanya berupa entry di file parent nya (opsional: file kosong sendiri)
+ *
+ * Tree diisi breadth-first sampai jumlah phase tercapai, jadi level atas selalu
+ * penuh dan leaf terkumpul di level terdalam. Dependencies hanya ke sibling
+ * sebelumnya, sehingga graph selalu acyclic. Seed yang sama = plan yang sama.
+ *
+ * Usage:
+ *   node generate-plan.js --phases 1000
+ *   node generate-plan.js --phases 50000 --fan-out 10 --depth 5 --dep-density 0.3 --dir /tmp/plan
+ */
+
+const DEFAULT_OPTIONS = {
+  phases: 1000,
+  depth: 0, // 0 = otomatis, kedalaman minimum yang muat untuk jumlah phase
+  fanOut: 8,
+  depDensity: 0.2,
+  maxDependencies: 3,
+  leafFileRatio: 0,
+  seed: 1
+};
+
+const PRIORITIES = ['high', 'medium', 'low'];
+
+// mulberry32: PRNG kecil yang deterministic per seed
+function createRandom(seed) {
+  let state = seed >>> 0;
+  return () => {
+    state = (state + 0x6D2B79F5) >>> 0;
+    let t = state;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+function getCapacity(depth, fanOut) {
+  let capacity = 0;
+  for (let level = 1; level <= depth; level++) {
+    capacity += Math.pow(fanOut, level);
+  }
+  return capacity;
+}
+
+/**
+ * Bangun tree in-memory: array node { id, level, children }
+ */
+function buildTree(options) {
+  const { phases, fanOut } = options;
+  let depth = options.depth;
+
+  if (fanOut < 1 || phases < 1) {
+    throw new Error('--phases and --fan-out must be at least 1');
+  }
+  if (!depth) {
+    depth = 1;
+    while (getCapacity(depth, fanOut) < phases) depth++;
+  }
+
+  if (getCapacity(depth, fanOut) < phases) {
+    throw new Error(`Cannot fit ${phases} phases with depth ${depth} and fan-out ${fanOut}, increase --depth or --fan-out`);
+  }
+
+  const roots = [];
+  const queue = [];
+  let total = 0;
+
+  const addChildren = (parent) => {
+    const siblings = parent ? parent.children : roots;
+    const count = Math.min(fanOut, phases - total);
+
+    for (let i = 1; i <= count; i++) {
+      const node = {
+        id: parent ? `${parent.id}.${i}` : `${i}`,
+        level: parent ? parent.level + 1 : 1,
+        children: []
+      };
+      siblings.push(node);
+      queue.push(node);
+      total++;
+    }
+  };
+
+  addChildren(null);
+  for (let head = 0; total < phases && head < queue.length; head++) {
+    if (queue[head].level < depth) {
+      addChildren(queue[head]);
+    }
+  }
+
+  return roots;
+}
+
+function buildEntries(nodes, random, options) {
+  return nodes.map((node, index) => {
+    const dependencies = [];
+    for (let i = 0; i < index && dependencies.length < options.maxDependencies; i++) {
+      if (random() < options.depDensity) {
+        dependencies.push(nodes[i].id);
+      }
+    }
+
+    return {
+      id: node.id,
+      title: `Synthetic phase ${node.id}`,
+      description: `Synthetic benchmark phase ${node.id} (level ${node.level})`,
+      status: 'pending',
+      priority: PRIORITIES[Math.floor(random() * PRIORITIES.length)],
+      duration: String(15 + Math.floor(random() * 106)), // menit, sebagian >60 untuk find-leaf-phases
+      dependencies,
+      deliverables: [`deliverable-${node.id}`]
+    };
+  });
+}
+
+/**
+ * Tulis synthetic plan ke planDir
+ * Return: statistik plan yang dihasilkan ({ phases, files, leaves, depth })
+ */
+function generatePlan(planDir = PLAN_DIR, options = {}) {
+  const settings = { ...DEFAULT_OPTIONS, ...options };
+  const random = createRandom(settings.seed);
+  const roots = buildTree(settings);
+  const stats = { phases: 0, files: 0, leaves: 0, depth: 0 };
+
+  fs.mkdirSync(planDir, { recursive: true });
+
+  const writePhaseFile = (phaseId, data) => {
+    fs.writeFileSync(path.join(planDir, `${phaseId}.json`), JSON.stringify(data, null, 2), 'utf8');
+    stats.files++;
+  };
+
+  fs.writeFileSync(path.join(planDir, 'phases.json'), JSON.stringify({
+    title: `Synthetic plan (${settings.phases} phases)`,
+    phases: buildEntries(roots, random, settings)
+  }, null, 2), 'utf8');
+
+  const stack = roots.map(node => ({ node, parentId: null }));
+  while (stack.length > 0) {
+    const { node, parentId } = stack.pop();
+    stats.phases++;
+    stats.depth = Math.max(stats.depth, node.level);
+
+    const base = {
+      title: `Synthetic phase ${node.id}`,
+      description: `Synthetic benchmark phase ${node.id} (level ${node.level})`,
+      status: 'pending'
+    };
+    if (parentId) base.parent_id = parentId;
+
+    if (node.children.length > 0) {
+      writePhaseFile(node.id, { ...base, phases: buildEntries(node.children, random, settings) });
+      node.children.forEach(child => stack.push({ node: child, parentId: node.id }));
+    } else {
+      stats.leaves++;
+      if (random() < settings.leafFileRatio) {
+        writePhaseFile(node.id, { ...base, phases: [] });
+      }
+    }
+  }
+
+  return stats;
+}
+
+function showUsage() {
+  console.log(`
+Usage: node generate-plan.js [options]
+
+Options:
+  --phases <n>            Jumlah total phase (default: ${DEFAULT_OPTIONS.phases})
+  --depth <n>             Kedalaman maksimum tree (default: otomatis dari --phases dan --fan-out)
+  --fan-out <n>           Jumlah sub-phases per phase (default: ${DEFAULT_OPTIONS.fanOut})
+  --dep-density <0-1>     Peluang dependency ke setiap sibling sebelumnya (default: ${DEFAULT_OPTIONS.depDensity})
+  --leaf-file-ratio <0-1> Porsi leaf yang punya file sendiri, menambah file count (default: ${DEFAULT_OPTIONS.leafFileRatio})
+  --seed <n>              Seed random generator (default: ${DEFAULT_OPTIONS.seed})
+  --dir <path>            Target directory (default: ${PLAN_DIR})
+  --force                 Hapus isi target directory terlebih dahulu
+  --help                  Tampilkan bantuan ini
+`);
+}
+
+function parseArgs(args) {
+  const options = {};
+  let planDir = PLAN_DIR;
+  let force = false;
+
+  const numberOptions = {
+    '--phases': 'phases',
+    '--depth': 'depth',
+    '--fan-out': 'fanOut',
+    '--dep-density': 'depDensity',
+    '--leaf-file-ratio': 'leafFileRatio',
+    '--seed': 'seed'
+  };
+
+  for (let i = 0; i < args.length; i++) {
+    const [flag, inlineValue] = args[i].split('=');
+
+    if (flag === '--force') {
+      force = true;
+    } else if (flag === '--dir') {
+      planDir = path.resolve(inlineValue !== undefined ? inlineValue : args[++i]);
+    } else if (numberOptions[flag]) {
+      const value = Number(inlineValue !== undefined ? inlineValue : args[++i]);
+      if (Number.isNaN(value)) {
+        throw new Error(`${flag} requires a numeric value`);
+      }
+      options[numberOptions[flag]] = value;
+    } else {
+      throw new Error(`Unknown option: ${args[i]}`);
+    }
+  }
+
+  return { options, planDir, force };
+}
+
+function main() {
+  const args = process.argv.slice(2);
+
+  if (args.includes('--help')) {
+    showUsage();
+    return;
+  }
+
+  let parsed;
+  try {
+    parsed = parseArgs(args);
+  } catch (error) {
+    console.error(`Error: ${error.message}`);
+    showUsage();
+    process.exit(1);
+  }
+
+  const { options, planDir, force } = parsed;
+  const existing = fs.existsSync(planDir)
+    ? fs.readdirSync(planDir).filter(fileName => fileName.endsWith('.json'))
+    : [];
+
+  if (existing.length > 0) {
+    if (!force) {
+      console.error(`Error: ${planDir} already contains ${existing.length} plan files, use --force to overwrite`);
+      process.exit(1);
+    }
+    existing.forEach(fileName => fs.unlinkSync(path.join(planDir, fileName)));
+  }
+
+  const startTime = Date.now();
+  let stats;
+  try {
+    stats = generatePlan(planDir, options);
+  } catch (error) {
+    console.error(`Error: ${error.message}`);
+    process.exit(1);
+  }
+
+  console.log(`✓ Generated ${stats.phases} phases (${stats.leaves} leaves, depth ${stats.depth}) in ${stats.files} phase files`);
+  console.log(`  ${planDir} (${Date.now() - startTime}ms)`);
+}
+
+if (require.main === module) {
+  main();
+}
+
+module.exports = {
+  DEFAULT_OPTIONS,
+  generatePlan
+};
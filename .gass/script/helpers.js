@@ -5,36 +5,69 @@
 const { spawn } = require('child_process');
 const path = require('path');
 const { query } = require('@anthropic-ai/claude-agent-sdk');
+const { updatePhaseStatus } = require('./update-phase-status');
+const { statusStore } = require('./status-store');
+const { AI_DIR, resultCache } = require('./result-cache');
+const { TaskLog, TAIL_SIZE } = require('./task-log');
+const { metrics } = require('./metrics');
+
+// File yang direferensikan prompt task & validation, ikut di-hash untuk cache key
+const TASK_CONTEXT_FILES = [
+    path.join(AI_DIR, 'structure', 'structure.md'),
+    path.join(AI_DIR, 'schemas', 'index.json')
+];
+
+// Keyword yang menentukan verdict validation (dilacak incremental oleh TaskLog)
+const VALIDATION_KEYWORDS = ['valid', 'complete', 'success', 'error', 'missing', 'perlu'];
+
+function isValidationPassed(hasKeyword) {
+    return hasKeyword('valid') ||
+        hasKeyword('complete') ||
+        hasKeyword('success') ||
+        (!hasKeyword('error') &&
+         !hasKeyword('missing') &&
+         !hasKeyword('perlu'));
+}
+
+/**
+ * Stream response SDK ke TaskLog (file .jsonl) tanpa menumpuk seluruh output di memory
+ */
+async function collectResponse(result, log, onProgress = null) {
+    if (!result) {
+        throw new Error('Empty response from Claude Agent SDK');
+    }
 
-function parseTaskOutput(output) {
-    const tasks = [];
-    const lines = output.split('\n');
-
-    for (const line of lines) {
-        const taskMatch = line.match(/(?:Task|📋|Phase)([^:]+):?\s*(.+)/);
-        if (taskMatch) {
-            const [, type, description] = taskMatch;
-
-            const phaseMatch = line.match(/(\d+(?:\.\d+)?)\b/);
-            const phaseId = phaseMatch ? phaseMatch[1] : 'unknown';
-
-            const priorityMatch = line.match(/priority[:\s]+(\d+)/i);
-            const priority = priorityMatch ? parseInt(priorityMatch[1]) : 999;
-
-            if (description && description.trim() && !description.includes('No tasks')) {
-                tasks.push({
-                    id: tasks.length + 1,
-                    phaseId,
-                    description: description.trim(),
-                    priority,
-                    status: 'pending',
-                    dependencies: 'completed'
-                });
+    try {
+        // Handle streaming response (async iterator)
+        if (typeof result[Symbol.asyncIterator] === 'function') {
+            for await (const message of result) {
+                const text = log.write(message);
+                if (onProgress && text) onProgress('stdout', text);
             }
         }
+        // Handle response with content property, plain string, or object response
+        else if (result.content || typeof result === 'string' || typeof result === 'object') {
+            const text = log.write(result);
+            if (onProgress && text) onProgress('stdout', text);
+        }
+        else {
+            throw new Error('Unknown response format from Claude Agent SDK');
+        }
+    } finally {
+        await log.close();
     }
 
-    return tasks;
+    return log;
+}
+
+function taskCacheContext(task) {
+    return {
+        id: task.id,
+        title: task.title,
+        description: task.description,
+        dependencies: task.dependencies,
+        deliverables: task.deliverables
+    };
 }
 
 function executeCommand(projectRoot, command, args = []) {
@@ -66,29 +99,22 @@ function executeCommand(projectRoot, command, args = []) {
     });
 }
 
-function updateTaskStatus(scriptDir, projectRoot, phaseId, status) {
-    return new Promise((resolve) => {
-        const scriptPath = path.join(scriptDir, 'update-phase-status.js');
-        const child = spawn('node', [scriptPath, '--status', status, '--phase', phaseId], {
-            cwd: projectRoot,
-            stdio: ['pipe', 'pipe', 'pipe']
-        });
-
-        let stdout = '';
-        let stderr = '';
-
-        child.stdout.on('data', (data) => stdout += data.toString());
-        child.stderr.on('data', (data) => stderr += data.toString());
-
-        child.on('close', (code) => {
-            if (code !== 0) {
-                console.warn(`⚠️  Warning: Failed to update status for phase ${phaseId}: ${stderr}`);
-            } else {
-                console.log(`✅ Updated phase ${phaseId} status to ${status}`);
-            }
-            resolve();
-        });
-    });
+async function updateTaskStatus(scriptDir, projectRoot, phaseId, status) {
+    // In-process: tidak perlu spawn `node update-phase-status.js` per task.
+    // Transisi di-journal lewat shared status store dan di-compact secara batch.
+    const span = metrics.startSpan('status_update', { taskId: phaseId, status });
+    try {
+        if (updatePhaseStatus(phaseId, status, statusStore, { compact: false })) {
+            span.end({ ok: true });
+            console.log(`✅ Updated phase ${phaseId} status to ${status}`);
+        } else {
+            span.end({ ok: false });
+            console.warn(`⚠️  Warning: Failed to update status for phase ${phaseId}`);
+        }
+    } catch (error) {
+        span.end({ ok: false });
+        console.warn(`⚠️  Warning: Failed to update status for phase ${phaseId}: ${error.message}`);
+    }
 }
 
 async function runClaudeTask(scriptDir, projectRoot, task, onProgress = null) {
@@ -100,9 +126,24 @@ async function runClaudeTask(scriptDir, projectRoot, task, onProgress = null) {
         let stdout = '';
         let stderr = '';
 
+        // Checkpoint untuk recovery setelah crash: output task disimpan setelah eksekusi
+        // dan dihapus lagi begitu validation memberi verdict. Hanya run yang berhenti di
+        // antara eksekusi dan verdict yang memakai ulang output; task yang dijalankan
+        // ulang (mis. di-reset ke pending) selalu dieksekusi lagi, karena task mengubah
+        // workspace yang tidak ikut di-hash.
+        const cacheKey = resultCache.computeKey('task', prompt, TASK_CONTEXT_FILES, taskCacheContext(task));
+        const cached = resultCache.get(cacheKey);
+        if (cached) {
+            console.log(`♻️  Task ${task.id} output recovered from unfinished run`);
+        }
+
+        // Span stage 'task': SDK call + streaming response (tanpa validation)
+        // Cache hit dicatat di stage sendiri supaya tidak menggeser percentile 'task'
+        const taskSpan = metrics.startSpan(cached ? 'task_cached' : 'task', { taskId: task.id });
+
         try {
             // Use Claude Agent SDK with Claude Code preset for backward compatibility
-            const result = await query({
+            const result = cached ? { content: cached.output } : await query({
                 prompt: prompt,
                 options: {
                     systemPrompt: { type: "preset", preset: "claude_code" },
@@ -110,50 +151,22 @@ async function runClaudeTask(scriptDir, projectRoot, task, onProgress = null) {
                 }
             });
 
-            // Process the response - handle multiple response formats
-            if (result) {
-                try {
-                    // Handle streaming response (async iterator)
-                    if (typeof result[Symbol.asyncIterator] === 'function') {
-                        for await (const message of result) {
-                            if (typeof message === 'string') {
-                                stdout += message;
-                                if (onProgress) onProgress('stdout', message);
-                            } else if (message && message.content) {
-                                stdout += message.content;
-                                if (onProgress) onProgress('stdout', message.content);
-                            } else if (message && typeof message === 'object') {
-                                // Handle object messages
-                                const content = JSON.stringify(message);
-                                stdout += content;
-                                if (onProgress) onProgress('stdout', content);
-                            }
-                        }
-                    }
-                    // Handle response with content property
-                    else if (result.content) {
-                        stdout = result.content;
-                        if (onProgress) onProgress('stdout', stdout);
-                    }
-                    // Handle plain string response
-                    else if (typeof result === 'string') {
-                        stdout = result;
-                        if (onProgress) onProgress('stdout', stdout);
-                    }
-                    // Handle object response (convert to string)
-                    else if (typeof result === 'object') {
-                        stdout = JSON.stringify(result);
-                        if (onProgress) onProgress('stdout', stdout);
-                    }
-                    else {
-                        throw new Error('Unknown response format from Claude Agent SDK');
-                    }
-                } catch (processingError) {
-                    console.error(`Error processing SDK response: ${processingError.message}`);
-                    throw new Error(`Response processing error: ${processingError.message}`);
-                }
-            } else {
-                throw new Error('Empty response from Claude Agent SDK');
+            // Stream response ke .ai/brain/log/<task>.jsonl, simpan tail saja di memory
+            const log = new TaskLog(task.id, 'task');
+            try {
+                await collectResponse(result, log, onProgress);
+            } catch (processingError) {
+                console.error(`Error processing SDK response: ${processingError.message}`);
+                throw new Error(`Response processing error: ${processingError.message}`);
+            }
+            stdout = log.tail;
+            taskSpan.end({ ok: true, chars: log.charCount });
+
+            // Hash output asli ikut disimpan di cache, jadi hasil dari cache tetap punya hash yang sama
+            const outputHash = cached && cached.outputHash ? cached.outputHash : log.getHash();
+
+            if (!cached && stdout) {
+                resultCache.set(cacheKey, { output: stdout, outputHash });
             }
 
             const taskResult = {
@@ -161,6 +174,8 @@ async function runClaudeTask(scriptDir, projectRoot, task, onProgress = null) {
                 success: true,
                 output: stdout,
                 error: stderr,
+                logFile: log.filePath,
+                outputHash,
                 validationPassed: false
             };
 
@@ -168,7 +183,7 @@ async function runClaudeTask(scriptDir, projectRoot, task, onProgress = null) {
 
             // Run validation
             try {
-                const validation = await runValidation(scriptDir, projectRoot, task);
+                const validation = await runValidation(scriptDir, projectRoot, task, outputHash);
                 taskResult.validationPassed = validation.passed;
                 taskResult.validationFeedback = validation.feedback;
 
@@ -179,6 +194,9 @@ async function runClaudeTask(scriptDir, projectRoot, task, onProgress = null) {
                     console.log(`⚠️  Task ${task.id} needs revisions based on validation`);
                     taskResult.validationOutput = validation.output;
                 }
+
+                // Verdict sudah ada: run berikutnya harus mengeksekusi task lagi
+                resultCache.delete(cacheKey);
             } catch (error) {
                 console.warn(`⚠️  Validation failed for task ${task.id}: ${error.message}`);
             }
@@ -186,6 +204,7 @@ async function runClaudeTask(scriptDir, projectRoot, task, onProgress = null) {
             return taskResult;
 
         } catch (sdkError) {
+            taskSpan.end({ ok: false });
             console.error(`❌ Claude Agent SDK error for task ${task.id}:`, sdkError.message);
 
             // Fallback to batch file if SDK fails
@@ -213,13 +232,30 @@ async function runClaudeTask(scriptDir, projectRoot, task, onProgress = null) {
     }
 }
 
-async function runValidation(scriptDir, projectRoot, task) {
+/**
+ * outputHash: hash output task yang divalidasi. Verdict hanya di-cache/dipakai ulang
+ * untuk output yang sama persis; tanpa outputHash cache tidak dipakai sama sekali.
+ */
+async function runValidation(scriptDir, projectRoot, task, outputHash = null) {
     try {
         const prompt = `Review dan validasi hasil task ${task.description}. Bandingkan dengan requirements awal di phase ${task.phaseId}. Cek: apa yang kurang, apa yang berlebihan, ada error/tidak. Jika kurang → tambahkan, jika berlebihan → kurangi, jika error → perbaiki. Reference: Berdasarkan .ai\\structure\\structure.md dan .ai\\schemas\\index.json. Validation checklist: Requirements compliance, Code quality (max 300 lines), Structure compliance, Completeness, Integration compatibility, Best practices (AI-friendly naming).`;
 
         let stdout = '';
         let stderr = '';
 
+        // Hanya verdict passed yang di-cache, verdict gagal selalu divalidasi ulang
+        const cacheKey = outputHash
+            ? resultCache.computeKey('validation', prompt, TASK_CONTEXT_FILES, { ...taskCacheContext(task), outputHash })
+            : null;
+        const cached = cacheKey ? resultCache.get(cacheKey) : null;
+        if (cached) {
+            console.log(`♻️  Validation for task ${task.id} served from cache`);
+            metrics.recordSpan('validation_cached', 0, { taskId: task.id, ok: true, passed: true });
+            return { passed: true, feedback: cached.output, output: cached.output, error: '', cached: true };
+        }
+
+        const validationSpan = metrics.startSpan('validation', { taskId: task.id });
+
         try {
             // Use Claude Agent SDK with Claude Code preset for validation
             const result = await query({
@@ -230,60 +266,33 @@ async function runValidation(scriptDir, projectRoot, task) {
                 }
             });
 
-            // Process the response - handle multiple response formats
-            if (result) {
-                try {
-                    // Handle streaming response (async iterator)
-                    if (typeof result[Symbol.asyncIterator] === 'function') {
-                        for await (const message of result) {
-                            if (typeof message === 'string') {
-                                stdout += message;
-                            } else if (message && message.content) {
-                                stdout += message.content;
-                            } else if (message && typeof message === 'object') {
-                                // Handle object messages
-                                stdout += JSON.stringify(message);
-                            }
-                        }
-                    }
-                    // Handle response with content property
-                    else if (result.content) {
-                        stdout = result.content;
-                    }
-                    // Handle plain string response
-                    else if (typeof result === 'string') {
-                        stdout = result;
-                    }
-                    // Handle object response (convert to string)
-                    else if (typeof result === 'object') {
-                        stdout = JSON.stringify(result);
-                    }
-                    else {
-                        throw new Error('Unknown response format from Claude Agent SDK');
-                    }
-                } catch (processingError) {
-                    console.error(`Error processing SDK validation response: ${processingError.message}`);
-                    throw new Error(`Validation response processing error: ${processingError.message}`);
-                }
-            } else {
-                throw new Error('Empty response from Claude Agent SDK');
+            // Stream response ke log file; verdict dihitung dari keyword yang muncul
+            const log = new TaskLog(task.id, 'validation', { keywords: VALIDATION_KEYWORDS });
+            try {
+                await collectResponse(result, log);
+            } catch (processingError) {
+                console.error(`Error processing SDK validation response: ${processingError.message}`);
+                throw new Error(`Validation response processing error: ${processingError.message}`);
             }
+            stdout = log.tail;
+
+            const passed = isValidationPassed(keyword => log.hasKeyword(keyword));
+            validationSpan.end({ ok: true, passed });
 
-            const passed = stdout.toLowerCase().includes('valid') ||
-                stdout.toLowerCase().includes('complete') ||
-                stdout.toLowerCase().includes('success') ||
-                (!stdout.toLowerCase().includes('error') &&
-                 !stdout.toLowerCase().includes('missing') &&
-                 !stdout.toLowerCase().includes('perlu'));
+            if (passed && cacheKey) {
+                resultCache.set(cacheKey, { output: stdout });
+            }
 
             return {
                 passed,
                 feedback: stdout,
                 output: stdout,
-                error: stderr
+                error: stderr,
+                logFile: log.filePath
             };
 
         } catch (sdkError) {
+            validationSpan.end({ ok: false });
             console.error(`❌ Claude Agent SDK validation error:`, sdkError.message);
 
             // Fallback to batch file if SDK fails
@@ -319,25 +328,27 @@ function runClaudeTaskFallback(scriptDir, projectRoot, task, onProgress = null)
             shell: true
         });
 
-        let stdout = '';
+        const log = new TaskLog(task.id, 'task-fallback');
         let stderr = '';
 
         child.stdout.on('data', (data) => {
-            stdout += data.toString();
-            if (onProgress) onProgress('stdout', data.toString());
+            const text = log.write(data.toString());
+            if (onProgress) onProgress('stdout', text);
         });
 
         child.stderr.on('data', (data) => {
-            stderr += data.toString();
+            stderr = (stderr + data.toString()).slice(-TAIL_SIZE);
             if (onProgress) onProgress('stderr', data.toString());
         });
 
         child.on('close', async (code) => {
+            await log.close();
             const result = {
                 task,
                 success: code === 0,
-                output: stdout,
+                output: log.tail,
                 error: stderr,
+                logFile: log.filePath,
                 validationPassed: false,
                 usedFallback: true
             };
@@ -346,7 +357,7 @@ function runClaudeTaskFallback(scriptDir, projectRoot, task, onProgress = null)
 
             if (result.success) {
                 try {
-                    const validation = await runValidation(scriptDir, projectRoot, task);
+                    const validation = await runValidation(scriptDir, projectRoot, task, log.getHash());
                     result.validationPassed = validation.passed;
                     result.validationFeedback = validation.feedback;
 
@@ -384,35 +395,52 @@ function runClaudeTaskFallback(scriptDir, projectRoot, task, onProgress = null)
 }
 
 function runValidationFallback(scriptDir, projectRoot, task) {
-    const batchPath = path.join(scriptDir, 'run_claude.bat');
-    const prompt = `Review dan validasi hasil task ${task.description}. Bandingkan dengan requirements awal di phase ${task.phaseId}. Cek: apa yang kurang, apa yang berlebihan, ada error/tidak. Jika kurang → tambahkan, jika berlebihan → kurangi, jika error → perbaiki. Reference: Berdasarkan .ai\\structure\\structure.md dan .ai\\schemas\\index.json. Validation checklist: Requirements compliance, Code quality (max 300 lines), Structure compliance, Completeness, Integration compatibility, Best practices (AI-friendly naming).`;
-    const command = `cmd /c cd /d "${projectRoot}" && "${batchPath}" "${prompt}"`;
-
-    return executeCommand(projectRoot, 'cmd', ['/c', command])
-        .then(({ stdout, stderr, code }) => {
-            const passed = code === 0 && (
-                stdout.toLowerCase().includes('valid') ||
-                stdout.toLowerCase().includes('complete') ||
-                stdout.toLowerCase().includes('success') ||
-                !stdout.toLowerCase().includes('error') &&
-                !stdout.toLowerCase().includes('missing') &&
-                !stdout.toLowerCase().includes('perlu')
-            );
+    return new Promise((resolve) => {
+        const batchPath = path.join(scriptDir, 'run_claude.bat');
+        const prompt = `Review dan validasi hasil task ${task.description}. Bandingkan dengan requirements awal di phase ${task.phaseId}. Cek: apa yang kurang, apa yang berlebihan, ada error/tidak. Jika kurang → tambahkan, jika berlebihan → kurangi, jika error → perbaiki. Reference: Berdasarkan .ai\\structure\\structure.md dan .ai\\schemas\\index.json. Validation checklist: Requirements compliance, Code quality (max 300 lines), Structure compliance, Completeness, Integration compatibility, Best practices (AI-friendly naming).`;
+        const command = `cmd /c cd /d "${projectRoot}" && "${batchPath}" "${prompt}"`;
 
-            return {
+        const child = spawn('cmd', ['/c', command], {
+            stdio: ['pipe', 'pipe', 'pipe'],
+            shell: true
+        });
+
+        // Sama seperti SDK path: stdout di-stream ke log file, verdict dari keyword yang muncul
+        const log = new TaskLog(task.id, 'validation-fallback', { keywords: VALIDATION_KEYWORDS });
+        let stderr = '';
+
+        child.stdout.on('data', (data) => {
+            log.write(data.toString());
+        });
+
+        child.stderr.on('data', (data) => {
+            stderr = (stderr + data.toString()).slice(-TAIL_SIZE);
+        });
+
+        child.on('close', async (code) => {
+            await log.close();
+            const passed = code === 0 && isValidationPassed(keyword => log.hasKeyword(keyword));
+
+            resolve({
                 passed,
-                feedback: stdout,
-                output: stdout,
+                feedback: log.tail,
+                output: log.tail,
                 error: stderr,
+                logFile: log.filePath,
                 usedFallback: true
-            };
-        })
-        .catch(error => ({
-            passed: false,
-            feedback: `Fallback validation error: ${error.message}`,
-            error: error.message,
-            usedFallback: true
-        }));
+            });
+        });
+
+        child.on('error', (error) => {
+            log.close();
+            resolve({
+                passed: false,
+                feedback: `Fallback validation error: ${error.message}`,
+                error: error.message,
+                usedFallback: true
+            });
+        });
+    });
 }
 
 function filterTasks(tasks, filter) {
@@ -428,7 +456,11 @@ function filterTasks(tasks, filter) {
 }
 
 
-function displaySummary(results, totalTasks, startTime) {
+function formatMs(ms) {
+    return ms >= 1000 ? `${(ms / 1000).toFixed(2)}s` : `${Math.round(ms)}ms`;
+}
+
+function displaySummary(results, totalTasks, startTime, schedulerStats = null) {
     const endTime = Date.now();
     const duration = ((endTime - startTime) / 1000).toFixed(2);
 
@@ -442,6 +474,30 @@ function displaySummary(results, totalTasks, startTime) {
     console.log(`Validation failed: ${results.filter(r => !r.validationPassed && r.success).length}`);
     console.log(`Duration: ${duration} seconds`);
 
+    if (schedulerStats) {
+        console.log(`Makespan: ${(schedulerStats.makespan / 1000).toFixed(2)}s (critical path: ${(schedulerStats.criticalPath / 1000).toFixed(2)}s, total work: ${(schedulerStats.totalWork / 1000).toFixed(2)}s)`);
+        console.log(`Slot utilization: ${(schedulerStats.utilization * 100).toFixed(1)}% (all slots busy ${(schedulerStats.saturation * 100).toFixed(1)}% of makespan)`);
+        if (schedulerStats.blocked > 0) {
+            console.log(`Still blocked: ${schedulerStats.blocked} tasks (dependencies not completed)`);
+        }
+    }
+
+    const cacheStats = resultCache.getStats();
+    if (cacheStats.enabled) {
+        console.log(`Cache: ${cacheStats.hits} hits, ${cacheStats.misses} misses`);
+    } else {
+        console.log('Cache: disabled (--no-cache)');
+    }
+
+    const stageSummary = metrics.getSummary({ pass: true });
+    if (Object.keys(stageSummary).length > 0) {
+        console.log('\n⏱️  STAGE TIMINGS (this pass):');
+        console.log(`   ${'Stage'.padEnd(20)}${'Count'.padStart(8)}${'p50'.padStart(10)}${'p95'.padStart(10)}${'Max'.padStart(10)}`);
+        Object.entries(stageSummary).forEach(([stage, stats]) => {
+            console.log(`   ${stage.padEnd(20)}${String(stats.count).padStart(8)}${formatMs(stats.p50).padStart(10)}${formatMs(stats.p95).padStart(10)}${formatMs(stats.max).padStart(10)}`);
+        });
+    }
+
     const failedTasks = results.filter(r => !r.success);
     if (failedTasks.length > 0) {
         console.log('\n❌ FAILED TASKS:');
@@ -524,6 +580,37 @@ async function writeJsonFile(filePath, data) {
     }
 }
 
+async function writeJsonFileAtomic(filePath, data) {
+    // Tulis ke file sementara lalu rename, supaya crash di tengah write tidak meninggalkan JSON setengah jadi
+    const tmpPath = `${filePath}.${process.pid}.${Date.now()}.tmp`;
+    try {
+        const content = JSON.stringify(data, null, 2);
+        await fs.writeFile(tmpPath, content, 'utf8');
+        await fs.rename(tmpPath, filePath);
+    } catch (error) {
+        await fs.unlink(tmpPath).catch(() => {});
+        console.error(`Gagal menulis file JSON ${filePath}:`, error);
+        throw error;
+    }
+}
+
+async function runWithConcurrency(items, limit, worker) {
+    // Bounded worker pool: maksimal `limit` worker aktif, masing-masing ambil item berikutnya dari queue
+    const results = new Array(items.length);
+    let nextIndex = 0;
+
+    const runWorker = async () => {
+        while (nextIndex < items.length) {
+            const index = nextIndex++;
+            results[index] = await worker(items[index], index);
+        }
+    };
+
+    const workerCount = Math.max(1, Math.min(limit, items.length));
+    await Promise.all(Array.from({ length: workerCount }, runWorker));
+    return results;
+}
+
 async function ensureDir(dirPath) {
     try {
         await fs.mkdir(dirPath, { recursive: true });
@@ -650,7 +737,6 @@ const logger = {
 };
 
 module.exports = {
-    parseTaskOutput,
     executeCommand,
     updateTaskStatus,
     runClaudeTask,
@@ -659,6 +745,8 @@ module.exports = {
     displaySummary,
     readJsonFile,
     writeJsonFile,
+    writeJsonFileAtomic,
+    runWithConcurrency,
     ensureDir,
     fileExists,
     parseDuration,
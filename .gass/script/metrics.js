@@ -0,0 +1,256 @@
+/**
+ * Instrumentation untuk run-tasks: spans, counters dan gauges per stage
+ *
+ * - Setiap span (discovery, queue_wait, task, validation, status_update,
+ *   task_total) di-append ke .ai/brain/metrics/metrics.jsonl, satu JSON per baris
+ * - Durasi per stage disimpan in-memory (reservoir sample) untuk p50/p95,
+ *   kumulatif sejak start dan per pass (reset lewat startPass())
+ * - Hasil yang diambil dari cache dicatat di stage terpisah (task_cached,
+ *   validation_cached) supaya tidak menggeser percentile stage aslinya
+ * - Opsional: endpoint Prometheus text format di http://127.0.0.1:<port>/metrics
+ *
+ * Semua record punya `run` (ID process runner), jadi beberapa run di file yang
+ * sama tetap bisa dipisahkan saat dianalisis.
+ */
+
+const fs = require('fs');
+const http = require('http');
+const path = require('path');
+
+const METRICS_DIR = path.join(__dirname, '..', 'brain', 'metrics');
+const METRICS_FILE = path.join(METRICS_DIR, 'metrics.jsonl');
+const MAX_SAMPLES = 10000; // per stage
+const PROMETHEUS_PREFIX = 'run_tasks_';
+
+function labelKey(name, labels) {
+    const entries = Object.entries(labels);
+    if (entries.length === 0) return name;
+    return `${name}{${entries.map(([key, value]) => `${key}="${String(value).replace(/["\\\n]/g, '_')}"`).join(',')}}`;
+}
+
+function percentile(sortedValues, p) {
+    if (sortedValues.length === 0) return 0;
+    const rank = Math.ceil(p * sortedValues.length) - 1;
+    return sortedValues[Math.min(sortedValues.length - 1, Math.max(0, rank))];
+}
+
+class Metrics {
+    constructor({ filePath = METRICS_FILE, maxSamples = MAX_SAMPLES, enabled = true } = {}) {
+        this.filePath = filePath;
+        this.maxSamples = maxSamples;
+        this.enabled = enabled;
+        this.runId = `${Date.now()}-${process.pid}`;
+
+        this.stages = new Map();
+        this.passStages = new Map();
+        this.counters = new Map();
+        this.gauges = new Map();
+
+        this.stream = null;
+        this.server = null;
+    }
+
+    /**
+     * Mulai span; panggil end(attrs) saat stage selesai. end() kedua kali diabaikan.
+     */
+    startSpan(stage, attrs = {}) {
+        const startedAt = process.hrtime.bigint();
+        let ended = false;
+
+        return {
+            end: (extra = {}) => {
+                if (ended) return 0;
+                ended = true;
+                const durationMs = Number(process.hrtime.bigint() - startedAt) / 1e6;
+                this.recordSpan(stage, durationMs, { ...attrs, ...extra });
+                return durationMs;
+            }
+        };
+    }
+
+    /**
+     * Catat span yang durasinya sudah diketahui (mis. queue wait dari scheduler)
+     */
+    recordSpan(stage, durationMs, attrs = {}) {
+        this.addSample(this.stages, stage, durationMs, attrs.ok === false);
+        this.addSample(this.passStages, stage, durationMs, attrs.ok === false);
+        this.write({ type: 'span', stage, durationMs: Math.round(durationMs * 100) / 100, ...attrs });
+    }
+
+    addSample(stages, stage, durationMs, failed) {
+        if (!stages.has(stage)) {
+            stages.set(stage, { count: 0, sum: 0, max: 0, errors: 0, samples: [] });
+        }
+
+        const stats = stages.get(stage);
+        stats.count++;
+        stats.sum += durationMs;
+        stats.max = Math.max(stats.max, durationMs);
+        if (failed) stats.errors++;
+
+        // Reservoir sampling: memory tetap terbatas untuk run yang sangat panjang
+        if (stats.samples.length < this.maxSamples) {
+            stats.samples.push(durationMs);
+        } else {
+            const index = Math.floor(Math.random() * stats.count);
+            if (index < this.maxSamples) stats.samples[index] = durationMs;
+        }
+    }
+
+    /**
+     * Mulai pass baru (satu iterasi run-tasks): reset statistik per pass,
+     * statistik kumulatif dan counters tidak berubah
+     */
+    startPass() {
+        this.passStages.clear();
+    }
+
+    increment(name, labels = {}, value = 1) {
+        const key = labelKey(name, labels);
+        this.counters.set(key, (this.counters.get(key) || 0) + value);
+    }
+
+    setGauge(name, value, labels = {}) {
+        this.gauges.set(labelKey(name, labels), value);
+    }
+
+    /**
+     * Ringkasan per stage: count, avg, p50, p95, max (ms), error count
+     * pass: true → hanya span sejak startPass() terakhir
+     */
+    getSummary({ pass = false } = {}) {
+        const summary = {};
+
+        for (const [stage, stats] of (pass ? this.passStages : this.stages)) {
+            const sorted = stats.samples.slice().sort((a, b) => a - b);
+            summary[stage] = {
+                count: stats.count,
+                avg: stats.count > 0 ? stats.sum / stats.count : 0,
+                p50: percentile(sorted, 0.5),
+                p95: percentile(sorted, 0.95),
+                max: stats.max,
+                errors: stats.errors
+            };
+        }
+
+        return summary;
+    }
+
+    /**
+     * Tulis snapshot summary (kumulatif + pass ini) + counters + gauges ke JSONL (dipanggil per pass)
+     */
+    writeSummary(extra = {}) {
+        this.write({
+            type: 'summary',
+            stages: this.getSummary(),
+            passStages: this.getSummary({ pass: true }),
+            counters: Object.fromEntries(this.counters),
+            gauges: Object.fromEntries(this.gauges),
+            ...extra
+        });
+    }
+
+    write(record) {
+        if (!this.enabled) return;
+
+        if (!this.stream) {
+            try {
+                fs.mkdirSync(path.dirname(this.filePath), { recursive: true });
+                this.stream = fs.createWriteStream(this.filePath, { flags: 'a' });
+                this.stream.on('error', (error) => {
+                    console.warn(`⚠️  Failed to write metrics ${this.filePath}: ${error.message}`);
+                    this.enabled = false;
+                    this.stream = null;
+                });
+            } catch (error) {
+                console.warn(`⚠️  Failed to open metrics ${this.filePath}: ${error.message}`);
+                this.enabled = false;
+                return;
+            }
+        }
+
+        this.stream.write(JSON.stringify({ ts: new Date().toISOString(), run: this.runId, ...record }) + '\n');
+    }
+
+    /**
+     * Prometheus text exposition format (version 0.0.4)
+     */
+    formatPrometheus() {
+        const lines = [];
+        const durationName = `${PROMETHEUS_PREFIX}stage_duration_seconds`;
+
+        lines.push(`# HELP ${durationName} Duration per run-tasks stage`);
+        lines.push(`# TYPE ${durationName} summary`);
+        for (const [stage, stats] of Object.entries(this.getSummary())) {
+            lines.push(`${durationName}{stage="${stage}",quantile="0.5"} ${stats.p50 / 1000}`);
+            lines.push(`${durationName}{stage="${stage}",quantile="0.95"} ${stats.p95 / 1000}`);
+            lines.push(`${durationName}_sum{stage="${stage}"} ${this.stages.get(stage).sum / 1000}`);
+            lines.push(`${durationName}_count{stage="${stage}"} ${stats.count}`);
+        }
+
+        const appendFamily = (entries, type) => {
+            const seen = new Set();
+            for (const [key, value] of entries) {
+                const name = PROMETHEUS_PREFIX + key.split('{')[0];
+                if (!seen.has(name)) {
+                    seen.add(name);
+                    lines.push(`# TYPE ${name} ${type}`);
+                }
+                lines.push(`${PROMETHEUS_PREFIX}${key} ${value}`);
+            }
+        };
+
+        // Urutkan supaya satu metric family tidak terpecah
+        appendFamily(Array.from(this.counters).sort(), 'counter');
+        appendFamily(Array.from(this.gauges).sort(), 'gauge');
+
+        return lines.join('\n') + '\n';
+    }
+
+    /**
+     * Endpoint lokal GET /metrics; tidak menahan process tetap hidup
+     */
+    startServer(port) {
+        if (this.server) return this.server;
+
+        this.server = http.createServer((req, res) => {
+            if (req.url === '/metrics') {
+                res.writeHead(200, { 'Content-Type': 'text/plain; version=0.0.4' });
+                res.end(this.formatPrometheus());
+            } else {
+                res.writeHead(404);
+                res.end();
+            }
+        });
+
+        this.server.on('error', (error) => {
+            console.warn(`⚠️  Metrics endpoint error: ${error.message}`);
+        });
+        this.server.listen(port, '127.0.0.1');
+        this.server.unref();
+        return this.server;
+    }
+
+    close() {
+        if (this.server) {
+            this.server.close();
+            this.server = null;
+        }
+
+        return new Promise(resolve => {
+            if (!this.stream) return resolve();
+            this.stream.end(resolve);
+            this.stream = null;
+        });
+    }
+}
+
+// Shared instance untuk helpers.js dan run-tasks.js
+const metrics = new Metrics();
+
+module.exports = {
+    METRICS_DIR,
+    METRICS_FILE,
+    Metrics,
+    metrics
+};
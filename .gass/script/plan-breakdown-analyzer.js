@@ -10,6 +10,9 @@
  * 5. Jika tasks.json tidak ada, generate dengan AI
  * 6. Simpan output di .ai/output/{phase_id}.json
  * 7. Loop terus sampai semua phases complete
+ *
+ * Phases diproses lewat bounded worker pool (--concurrency=N AI calls paralel)
+ * dan loop berjalan iteratif, bukan rekursif.
  */
 
 const fs = require('fs').promises;
@@ -22,6 +25,8 @@ const readline = require('readline');
 const {
   readJsonFile,
   writeJsonFile,
+  writeJsonFileAtomic,
+  runWithConcurrency,
   ensureDir,
   fileExists,
   parseDuration,
@@ -30,6 +35,7 @@ const {
   getPhaseDuration,
   validatePhaseData
 } = require('./helpers');
+const { resultCache } = require('./result-cache');
 
 // Track state untuk loop
 const state = {
@@ -39,8 +45,10 @@ const state = {
   currentIteration: 0
 };
 
+const DEFAULT_CONCURRENCY = 4;
+
 class PlanBreakdownAnalyzer {
-    constructor() {
+    constructor(options = {}) {
         // Set working directory to project root instead of script directory
         this.projectRoot = process.cwd();
         if (this.projectRoot.endsWith('script')) {
@@ -50,6 +58,13 @@ class PlanBreakdownAnalyzer {
         this.planDir = path.join(this.projectRoot, 'plan');
         this.outputDir = path.join(this.projectRoot, 'output');
         this.loopTrackingFile = path.join(this.projectRoot, '.breakdown_loop_state.json');
+
+        // Jumlah AI call yang boleh in-flight bersamaan
+        this.concurrency = options.concurrency === undefined ? DEFAULT_CONCURRENCY : options.concurrency;
+        if (!Number.isInteger(this.concurrency) || this.concurrency < 1) {
+            throw new Error(`Invalid concurrency: ${options.concurrency} (must be a positive integer)`);
+        }
+        this.pendingStateSave = Promise.resolve();
     }
 
     /**
@@ -71,22 +86,26 @@ class PlanBreakdownAnalyzer {
     }
 
     /**
-     * Save loop state ke file
+     * Save loop state ke file (atomic write, diserialisasi antar worker)
      */
-    async saveLoopState() {
-        try {
-            const stateData = {
-                completedPhases: Array.from(state.completedPhases),
-                failedPhases: Array.from(state.failedPhases),
-                currentIteration: state.currentIteration,
-                lastUpdated: new Date().toISOString()
-            };
+    saveLoopState() {
+        this.pendingStateSave = this.pendingStateSave.then(async () => {
+            try {
+                const stateData = {
+                    completedPhases: Array.from(state.completedPhases),
+                    failedPhases: Array.from(state.failedPhases),
+                    currentIteration: state.currentIteration,
+                    lastUpdated: new Date().toISOString()
+                };
+
+                await writeJsonFileAtomic(this.loopTrackingFile, stateData);
+                logger.debug('Loop state saved');
+            } catch (error) {
+                logger.error('Failed to save loop state:', error.message);
+            }
+        });
 
-            await writeJsonFile(this.loopTrackingFile, stateData);
-            logger.debug('Loop state saved');
-        } catch (error) {
-            logger.error('Failed to save loop state:', error.message);
-        }
+        return this.pendingStateSave;
     }
 
     /**
@@ -192,12 +211,24 @@ class PlanBreakdownAnalyzer {
             const phaseFileName = `${phase.id}.json`;
             const outputPath = path.join(this.outputDir, phaseFileName);
 
-            // Panggil AI dengan task manager
-            const result = await this.callAI(prompt, outputPath);
+            // Panggil AI dengan task manager (atau pakai hasil cache jika prompt & referensi tidak berubah).
+            // Key hanya dari input: prompt, entry phase di phases.json dan file referensi 1.1.json.
+            // {phase.id}.json tidak ikut karena file itu yang ditimpa hasil breakdown.
+            const referenceFiles = phaseFileName === '1.1.json' ? [] : [path.join(this.planDir, '1.1.json')];
+            const cacheKey = resultCache.computeKey('breakdown', prompt, referenceFiles, phase);
+            const cached = resultCache.get(cacheKey);
+            const result = cached ? { success: true, data: cached.data } : await this.callAI(prompt, outputPath);
+
+            if (cached) {
+                logger.info(`♻️  Breakdown for phase ${phase.id} served from cache`);
+            }
 
             if (result.success) {
                 // Update status di plan directory
                 await this.updatePhaseTasks(phase.id, result.data);
+                if (!cached) {
+                    resultCache.set(cacheKey, { data: result.data });
+                }
                 state.completedPhases.add(phase.id.toString());
                 state.failedPhases.delete(phase.id.toString()); // Remove from failed if present
 
@@ -396,26 +427,26 @@ Output format: JSON dengan struktur seperti contoh yang ada (lihat file .ai/plan
 
     /**
      * Main loop untuk breakdown semua phases
+     * Iteratif: setiap iterasi memproses phase yang belum completed lewat worker pool
      */
     async breakdownAllPhases() {
         try {
             await ensureDir(this.outputDir);
             await this.loadLoopState();
 
-            // Baca plan
+            // Baca plan sekali, bukan setiap iterasi
             const planData = await this.readPlanJson();
             const phases = planData.phases;
 
-            logger.info(`🚀 Starting breakdown loop for ${phases.length} phases`);
+            logger.info(`🚀 Starting breakdown loop for ${phases.length} phases (concurrency: ${this.concurrency})`);
             logger.info(`📊 Current state: ${state.completedPhases.size} completed, ${state.failedPhases.size} failed`);
 
-            let allComplete = true;
-            let processedInThisIteration = 0;
+            while (true) {
+                const queue = phases.filter(phase => !state.completedPhases.has(phase.id.toString()));
+                let processedInThisIteration = 0;
 
-            // Proses semua phases
-            for (const phase of phases) {
-                if (!state.completedPhases.has(phase.id.toString())) {
-                    allComplete = false;
+                // Proses phases paralel, maksimal `concurrency` AI call in-flight
+                await runWithConcurrency(queue, this.concurrency, async (phase) => {
                     const success = await this.processPhase(phase);
                     if (success) {
                         processedInThisIteration++;
@@ -423,26 +454,24 @@ Output format: JSON dengan struktur seperti contoh yang ada (lihat file .ai/plan
 
                     // Save state setelah setiap phase
                     await this.saveLoopState();
-                }
-            }
+                });
 
-            state.currentIteration++;
+                state.currentIteration++;
+
+                if (queue.length === 0) {
+                    logger.info(`🎉 All phases completed! Total iterations: ${state.currentIteration}`);
+                    await this.resetLoopState();
+                    return true;
+                }
 
-            if (allComplete) {
-                logger.info(`🎉 All phases completed! Total iterations: ${state.currentIteration}`);
-                await this.resetLoopState();
-                return true;
-            } else {
                 logger.info(`📈 Iteration ${state.currentIteration} complete. Processed ${processedInThisIteration} phases.`);
                 logger.info(`📊 Status: ${state.completedPhases.size}/${phases.length} phases completed`);
 
                 if (state.currentIteration >= state.maxIterations) {
                     logger.error(`🛑 Maximum iterations (${state.maxIterations}) reached`);
+                    await this.saveLoopState();
                     return false;
                 }
-
-                // Continue loop
-                return await this.breakdownAllPhases();
             }
 
         } catch (error) {
@@ -470,19 +499,34 @@ Output format: JSON dengan struktur seperti contoh yang ada (lihat file .ai/plan
  * Main execution
  */
 async function main() {
-    const analyzer = new PlanBreakdownAnalyzer();
+    const args = process.argv.slice(2);
+
+    // Check for concurrency (--concurrency=N)
+    const concurrencyArg = args.find(arg => arg.startsWith('--concurrency='));
+    const concurrencyValue = concurrencyArg ? concurrencyArg.split('=')[1] : String(DEFAULT_CONCURRENCY);
+    const concurrency = Number(concurrencyValue);
+
+    if (!/^\d+$/.test(concurrencyValue) || concurrency < 1) {
+        console.error(chalk.red(`❌ Invalid --concurrency value "${concurrencyValue}" (must be a positive integer)`));
+        process.exit(1);
+    }
+
+    const analyzer = new PlanBreakdownAnalyzer({ concurrency });
 
     try {
         console.log(chalk.blue.bold('🔨 Enhanced Plan Breakdown Analyzer with Loop Tracking'));
         console.log(chalk.gray('==================================================='));
 
         // Check for reset flag
-        const args = process.argv.slice(2);
         if (args.includes('--reset')) {
             console.log(chalk.yellow('🔄 Resetting loop state...'));
             await analyzer.resetLoopState();
         }
 
+        if (args.includes('--no-cache')) {
+            resultCache.enabled = false;
+        }
+
         if (args.includes('--status')) {
             await analyzer.loadLoopState();
             const status = analyzer.getStatusSummary();
@@ -502,6 +546,11 @@ async function main() {
         // Run breakdown loop
         const success = await analyzer.breakdownAllPhases();
 
+        const cacheStats = resultCache.getStats();
+        if (cacheStats.enabled) {
+            console.log(chalk.gray(`Cache: ${cacheStats.hits} hits, ${cacheStats.misses} misses`));
+        }
+
         if (success) {
             console.log(chalk.green.bold('✅ Breakdown completed successfully!'));
             process.exit(0);
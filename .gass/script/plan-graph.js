@@ -0,0 +1,370 @@
+const fs = require('fs');
+const path = require('path');
+
+const PLAN_DIR = path.join(__dirname, '..', 'plan');
+
+/**
+ * Plan graph in-memory untuk direktori .ai/plan
+ *
+ * Semua phase file dibaca SEKALI lalu di-index berdasarkan ID:
+ * - files:      phaseId → isi JSON phase file ({phaseId}.json)
+ * - entries:    phaseId → sub-phase entry di dalam `phases` array parent nya
+ * - parents:    phaseId → ID parent (file yang me-list phase tersebut)
+ * - children:   phaseId → ID sub-phases (urutan sesuai `phases` array)
+ * - dependents: phaseId → ID phase yang depend ke phase tersebut
+ *
+ * Dipakai oleh get-leaf-tasks.js, find-leaf-phases.js dan update-phase-status.js
+ * supaya query leaf / ready-set / ancestor tidak perlu baca ulang file.
+ */
+
+const EXCLUDED_FILES = ['phases.json', 'index.json'];
+
+function loadJSON(filePath) {
+  try {
+    const content = fs.readFileSync(filePath, 'utf8');
+    return JSON.parse(content);
+  } catch (error) {
+    console.error(`Error loading ${filePath}:`, error.message);
+    return null;
+  }
+}
+
+function normalizePriority(priority) {
+  if (typeof priority === 'string') {
+    return priority === 'high' ? 1 : priority === 'medium' ? 2 : priority === 'low' ? 3 : 999;
+  }
+  return priority || 999;
+}
+
+function compareTasks(a, b) {
+  if (a.priority !== b.priority) {
+    return a.priority - b.priority;
+  }
+  return a.id.localeCompare(b.id, undefined, { numeric: true });
+}
+
+class PlanGraph {
+  constructor(planDir = PLAN_DIR) {
+    this.planDir = planDir;
+    this.files = new Map();
+    this.filePaths = new Map();
+    this.entries = new Map();
+    this.parents = new Map();
+    this.children = new Map();
+    this.dependents = new Map();
+  }
+
+  /**
+   * Scan planDir sekali dan parse semua phase file
+   * Option recursive: ikut scan sub-directory (dipakai find-leaf-phases.js)
+   */
+  load({ recursive = false } = {}) {
+    this.files.clear();
+    this.filePaths.clear();
+
+    if (!fs.existsSync(this.planDir)) {
+      this.rebuildIndex();
+      return this;
+    }
+
+    const scanDirectory = (dir) => {
+      const items = fs.readdirSync(dir, { withFileTypes: true });
+
+      for (const item of items) {
+        const fullPath = path.join(dir, item.name);
+
+        if (item.isDirectory()) {
+          if (recursive) scanDirectory(fullPath);
+        } else if (item.name.endsWith('.json') && !EXCLUDED_FILES.includes(item.name)) {
+          const data = loadJSON(fullPath);
+          if (data) {
+            const phaseId = item.name.replace(/\.json$/, '');
+            this.files.set(phaseId, data);
+            this.filePaths.set(phaseId, fullPath);
+          }
+        }
+      }
+    };
+
+    scanDirectory(this.planDir);
+    this.rebuildIndex();
+    return this;
+  }
+
+  /**
+   * Bangun ulang adjacency (parent/child/dependency) dari files yang sudah ada di memory
+   */
+  rebuildIndex() {
+    this.entries.clear();
+    this.parents.clear();
+    this.children.clear();
+    this.dependents.clear();
+
+    for (const [phaseId, data] of this.files) {
+      this.indexFile(phaseId, data);
+    }
+  }
+
+  indexFile(phaseId, data) {
+    if (!data || !Array.isArray(data.phases)) {
+      return;
+    }
+
+    const childIds = [];
+    data.phases.forEach(subPhase => {
+      if (!subPhase || subPhase.id === undefined) return;
+
+      const subId = subPhase.id.toString();
+      childIds.push(subId);
+      this.entries.set(subId, subPhase);
+      this.parents.set(subId, phaseId);
+
+      (subPhase.dependencies || []).forEach(depId => {
+        const key = depId.toString();
+        if (!this.dependents.has(key)) {
+          this.dependents.set(key, new Set());
+        }
+        this.dependents.get(key).add(subId);
+      });
+    });
+
+    this.children.set(phaseId, childIds);
+  }
+
+  unindexFile(phaseId) {
+    const childIds = this.children.get(phaseId) || [];
+
+    childIds.forEach(subId => {
+      if (this.parents.get(subId) !== phaseId) return; // Sudah di-claim file lain
+
+      const entry = this.entries.get(subId);
+      ((entry && entry.dependencies) || []).forEach(depId => {
+        const waiting = this.dependents.get(depId.toString());
+        if (waiting) {
+          waiting.delete(subId);
+          if (waiting.size === 0) this.dependents.delete(depId.toString());
+        }
+      });
+
+      this.entries.delete(subId);
+      this.parents.delete(subId);
+    });
+
+    this.children.delete(phaseId);
+  }
+
+  /**
+   * Incremental update untuk satu phase file (dipakai plan-watcher.js):
+   * hanya adjacency milik file tersebut yang di-index ulang
+   */
+  setPhaseFile(phaseId, data, filePath = path.join(this.planDir, `${phaseId}.json`)) {
+    this.unindexFile(phaseId);
+    this.files.set(phaseId, data);
+    this.filePaths.set(phaseId, filePath);
+    this.indexFile(phaseId, data);
+  }
+
+  removePhaseFile(phaseId) {
+    this.unindexFile(phaseId);
+    this.files.delete(phaseId);
+    this.filePaths.delete(phaseId);
+  }
+
+  getPhaseData(phaseId) {
+    return this.files.get(phaseId.toString()) || null;
+  }
+
+  getFilePath(phaseId) {
+    const id = phaseId.toString();
+    return this.filePaths.get(id) || path.join(this.planDir, `${id}.json`);
+  }
+
+  hasPhaseFile(phaseId) {
+    return this.files.has(phaseId.toString());
+  }
+
+  /**
+   * Status phase dari phase file nya sendiri, fallback ke entry di parent
+   * (leaf tanpa file terpisah). 'unknown' jika phase tidak dikenal sama sekali
+   */
+  getPhaseStatus(phaseId) {
+    const id = phaseId.toString();
+    const data = this.getPhaseData(id);
+    if (data) {
+      return data.status || 'pending';
+    }
+    const entry = this.entries.get(id);
+    return entry ? (entry.status || 'pending') : 'unknown';
+  }
+
+  areDependenciesCompleted(dependencies) {
+    if (!dependencies || dependencies.length === 0) {
+      return true; // Tidak ada dependency = bisa dikerjakan
+    }
+    return dependencies.every(depId => this.getPhaseStatus(depId) === 'completed');
+  }
+
+  getDependencies(phaseId) {
+    const entry = this.entries.get(phaseId.toString());
+    return entry && entry.dependencies ? entry.dependencies.map(depId => depId.toString()) : [];
+  }
+
+  getDependents(phaseId) {
+    return Array.from(this.dependents.get(phaseId.toString()) || []);
+  }
+
+  getChildren(phaseId) {
+    return this.children.get(phaseId.toString()) || [];
+  }
+
+  /**
+   * Leaf = tidak punya phase file, ATAU punya file tapi tanpa sub-phases
+   */
+  isTrueLeafPhase(phaseId) {
+    const data = this.getPhaseData(phaseId);
+    return !(data && data.phases && data.phases.length > 0);
+  }
+
+  /**
+   * Parent dari phase: file yang me-list phase ini, fallback ke field parent_id
+   */
+  getParentId(phaseId) {
+    const id = phaseId.toString();
+    if (this.parents.has(id)) {
+      return this.parents.get(id);
+    }
+    const data = this.getPhaseData(id);
+    return data && data.parent_id ? data.parent_id.toString() : null;
+  }
+
+  /**
+   * Ancestor chain dari phaseId (phaseId sendiri ikut), root parent first
+   */
+  getAncestors(phaseId) {
+    const hierarchy = [];
+    const visited = new Set();
+    let currentId = phaseId ? phaseId.toString() : null;
+
+    while (currentId && !visited.has(currentId)) {
+      visited.add(currentId);
+      const data = this.getPhaseData(currentId);
+      if (!data) break;
+
+      hierarchy.push({
+        id: currentId,
+        title: data.title,
+        description: data.description,
+        status: data.status,
+        progress: data.progress || 0
+      });
+
+      currentId = this.getParentId(currentId);
+    }
+
+    return hierarchy.reverse();
+  }
+
+  buildTask(subPhase, parentId, parentData) {
+    return {
+      id: subPhase.id,
+      title: subPhase.title,
+      description: subPhase.description,
+      duration: subPhase.duration,
+      priority: normalizePriority(subPhase.priority),
+      parent_id: parentId,
+      parent_status: parentData.status,
+      status: subPhase.status,
+      dependencies: subPhase.dependencies || [],
+      deliverables: subPhase.deliverables || [],
+      is_leaf: true
+    };
+  }
+
+  /**
+   * Pending leaf tasks di bawah satu parent phase (urutan sesuai phases array)
+   * Option readyOnly: hanya yang dependencies nya sudah completed
+   */
+  getLeafTasksForPhase(phaseId, { readyOnly = true } = {}) {
+    const id = phaseId.toString();
+    const data = this.getPhaseData(id);
+
+    if (!data || !data.phases || !Array.isArray(data.phases)) {
+      return [];
+    }
+
+    const tasks = [];
+    data.phases.forEach(subPhase => {
+      if (!subPhase || subPhase.id === undefined) return;
+      if (!this.isTrueLeafPhase(subPhase.id)) return; // Bukan leaf node, skip
+
+      const depsCompleted = !readyOnly || this.areDependenciesCompleted(subPhase.dependencies);
+      const isPending = subPhase.status === 'pending';
+
+      if (depsCompleted && isPending) {
+        tasks.push(this.buildTask(subPhase, id, data));
+      }
+    });
+
+    return tasks;
+  }
+
+  getReadyLeafTasksForPhase(phaseId) {
+    return this.getLeafTasksForPhase(phaseId, { readyOnly: true });
+  }
+
+  /**
+   * Semua leaf tasks (ready, atau semua pending jika readyOnly false), sorted by priority lalu ID
+   */
+  getLeafTasks({ readyOnly = true } = {}) {
+    const tasks = [];
+
+    for (const [phaseId, data] of this.files) {
+      if (data && data.title) {
+        tasks.push(...this.getLeafTasksForPhase(phaseId, { readyOnly }));
+      }
+    }
+
+    return tasks.sort(compareTasks);
+  }
+
+  getReadyLeafTasks() {
+    return this.getLeafTasks({ readyOnly: true });
+  }
+
+  /**
+   * Pending leaf tasks termasuk yang masih blocked dependency (dipakai scheduler)
+   */
+  getPendingLeafTasks() {
+    return this.getLeafTasks({ readyOnly: false });
+  }
+
+  /**
+   * Phase file yang punya child file ({id}.N.json) — pengganti regex scan O(N²)
+   */
+  getPhaseIdsWithChildFiles() {
+    const withChildren = new Set();
+
+    for (const phaseId of this.files.keys()) {
+      const match = phaseId.match(/^(.+)\.\d+$/);
+      if (match) {
+        withChildren.add(match[1]);
+      }
+    }
+
+    return withChildren;
+  }
+}
+
+function loadPlanGraph(planDir = PLAN_DIR, options = {}) {
+  return new PlanGraph(planDir).load(options);
+}
+
+module.exports = {
+  PLAN_DIR,
+  EXCLUDED_FILES,
+  PlanGraph,
+  loadPlanGraph,
+  loadJSON,
+  normalizePriority,
+  compareTasks
+};
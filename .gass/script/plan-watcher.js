@@ -0,0 +1,256 @@
+const fs = require('fs');
+const path = require('path');
+const { EventEmitter } = require('events');
+const { PLAN_DIR, EXCLUDED_FILES, PlanGraph, loadJSON, compareTasks } = require('./plan-graph');
+
+/**
+ * Incremental watcher untuk direktori .ai/plan
+ *
+ * Menjaga satu PlanGraph tetap up to date tanpa full rescan:
+ * - fs.watch memberi nama file yang berubah; setelah debounce hanya file itu yang
+ *   di-stat dan (jika mtime/size berubah) di-parse ulang
+ * - adjacency di-update per file lewat PlanGraph.setPhaseFile/removePhaseFile
+ * - readiness hanya dicek ulang untuk leaf di bawah file yang berubah dan
+ *   dependents nya (PlanGraph.getDependents), bukan seluruh plan
+ * - full stat scan hanya saat start, refresh() tanpa argumen, dan fallback interval
+ *
+ * Event:
+ * - 'change' (changedIds)  → ada phase file yang berubah/hilang
+ * - 'ready'  (newTasks)    → ada leaf task yang baru menjadi ready
+ */
+
+const DEBOUNCE_MS = 50;
+const FALLBACK_INTERVAL_MS = 30000; // Safety net jika fs.watch melewatkan event
+
+class PlanWatcher extends EventEmitter {
+  constructor(planDir = PLAN_DIR, options = {}) {
+    super();
+    this.planDir = planDir;
+    this.debounceMs = options.debounceMs || DEBOUNCE_MS;
+    this.fallbackIntervalMs = options.fallbackIntervalMs || FALLBACK_INTERVAL_MS;
+
+    this.graph = new PlanGraph(planDir);
+    this.fingerprints = new Map();
+    this.readyIds = new Set();
+    this.initialized = false;
+
+    this.pendingFiles = new Set();
+    this.pendingFullScan = false;
+
+    this.watcher = null;
+    this.fallbackTimer = null;
+    this.debounceTimer = null;
+  }
+
+  /**
+   * Initial load + mulai watch
+   */
+  start() {
+    this.refresh();
+
+    try {
+      this.watcher = fs.watch(this.planDir, (eventType, fileName) => {
+        if (!fileName) {
+          this.pendingFullScan = true; // Platform tidak memberi nama file
+        } else if (fileName.toString().endsWith('.json')) {
+          this.pendingFiles.add(fileName.toString());
+        } else {
+          return;
+        }
+        this.scheduleRefresh();
+      });
+      this.watcher.on('error', (error) => {
+        console.warn(`⚠️  Plan watcher error: ${error.message}`);
+      });
+    } catch (error) {
+      console.warn(`⚠️  fs.watch unavailable (${error.message}), using ${this.fallbackIntervalMs / 1000}s fingerprint polling`);
+    }
+
+    // Tanpa fs.watch, timer ini satu-satunya yang menjaga process tetap hidup
+    this.fallbackTimer = setInterval(() => this.refresh(), this.fallbackIntervalMs);
+    if (this.watcher) this.fallbackTimer.unref();
+
+    return this;
+  }
+
+  stop() {
+    if (this.watcher) this.watcher.close();
+    if (this.fallbackTimer) clearInterval(this.fallbackTimer);
+    if (this.debounceTimer) clearTimeout(this.debounceTimer);
+    this.watcher = null;
+    this.fallbackTimer = null;
+    this.debounceTimer = null;
+  }
+
+  scheduleRefresh() {
+    if (this.debounceTimer) return;
+    this.debounceTimer = setTimeout(() => {
+      this.debounceTimer = null;
+
+      const fileNames = this.pendingFullScan ? null : Array.from(this.pendingFiles);
+      this.pendingFiles.clear();
+      this.pendingFullScan = false;
+      this.refresh(fileNames);
+    }, this.debounceMs);
+  }
+
+  /**
+   * Refresh phase files: hanya fileNames yang diberikan, atau full stat scan jika null.
+   * File yang fingerprint nya berubah di-parse ulang.
+   * Return: daftar phase ID yang berubah
+   */
+  refresh(fileNames = null) {
+    const changedIds = [];
+    const previousChildren = new Map();
+
+    const updateFile = (fileName) => {
+      if (!fileName.endsWith('.json') || EXCLUDED_FILES.includes(fileName)) return;
+
+      const phaseId = fileName.replace(/\.json$/, '');
+      const filePath = path.join(this.planDir, fileName);
+      let stat = null;
+
+      try {
+        stat = fs.statSync(filePath);
+      } catch {
+        // File hilang
+      }
+
+      if (!stat || !stat.isFile()) {
+        if (this.fingerprints.has(phaseId)) {
+          previousChildren.set(phaseId, this.graph.getChildren(phaseId));
+          this.fingerprints.delete(phaseId);
+          this.graph.removePhaseFile(phaseId);
+          changedIds.push(phaseId);
+        }
+        return;
+      }
+
+      const fingerprint = `${stat.mtimeMs}:${stat.size}`;
+      if (this.fingerprints.get(phaseId) === fingerprint) return;
+
+      const data = loadJSON(filePath);
+      if (!data) return; // Kemungkinan file sedang ditulis, coba lagi di event berikutnya
+
+      previousChildren.set(phaseId, this.graph.getChildren(phaseId));
+      this.fingerprints.set(phaseId, fingerprint);
+      this.graph.setPhaseFile(phaseId, data, filePath);
+      changedIds.push(phaseId);
+    };
+
+    if (fileNames) {
+      new Set(fileNames).forEach(updateFile);
+    } else {
+      let existing = [];
+      try {
+        existing = fs.readdirSync(this.planDir);
+      } catch (error) {
+        return changedIds; // Plan dir belum ada
+      }
+
+      const seen = new Set(existing);
+      existing.forEach(updateFile);
+
+      // File yang hilang sejak scan sebelumnya
+      Array.from(this.fingerprints.keys())
+        .filter(phaseId => !seen.has(`${phaseId}.json`))
+        .forEach(phaseId => updateFile(`${phaseId}.json`));
+    }
+
+    if (changedIds.length > 0) {
+      this.emit('change', changedIds);
+      this.updateReadiness(changedIds, previousChildren);
+    }
+
+    return changedIds;
+  }
+
+  /**
+   * Leaf yang statusnya mungkin berubah karena file changedIds berubah:
+   * phase itu sendiri, children (lama & baru), dan dependents dari semuanya
+   */
+  getAffectedLeafIds(changedIds, previousChildren) {
+    const affected = new Set();
+
+    changedIds.forEach(phaseId => {
+      const touched = [phaseId, ...this.graph.getChildren(phaseId), ...(previousChildren.get(phaseId) || [])];
+      touched.forEach(id => {
+        affected.add(id);
+        this.graph.getDependents(id).forEach(dependentId => affected.add(dependentId));
+      });
+    });
+
+    return affected;
+  }
+
+  /**
+   * Task untuk leaf yang ready (pending, leaf, dependencies completed), atau null
+   */
+  buildReadyTask(phaseId) {
+    const entry = this.graph.entries.get(phaseId);
+    const parentId = this.graph.getParentId(phaseId);
+    const parentData = parentId ? this.graph.getPhaseData(parentId) : null;
+
+    if (!entry || !parentData || !parentData.title) return null;
+    if (entry.status !== 'pending' || !this.graph.isTrueLeafPhase(phaseId)) return null;
+    if (!this.graph.areDependenciesCompleted(entry.dependencies)) return null;
+
+    return this.graph.buildTask(entry, parentId, parentData);
+  }
+
+  /**
+   * Update ready set: full hitung ulang saat pertama kali, setelah itu hanya leaf yang terdampak.
+   * Emit 'ready' untuk task yang baru ready.
+   */
+  updateReadiness(changedIds = [], previousChildren = new Map()) {
+    let newTasks;
+
+    if (!this.initialized) {
+      this.initialized = true;
+      newTasks = this.graph.getReadyLeafTasks();
+      this.readyIds = new Set(newTasks.map(task => task.id.toString()));
+    } else {
+      newTasks = [];
+      this.getAffectedLeafIds(changedIds, previousChildren).forEach(phaseId => {
+        const task = this.buildReadyTask(phaseId);
+        if (!task) {
+          this.readyIds.delete(phaseId);
+        } else if (!this.readyIds.has(phaseId)) {
+          this.readyIds.add(phaseId);
+          newTasks.push(task);
+        }
+      });
+      newTasks.sort(compareTasks);
+    }
+
+    if (newTasks.length > 0) {
+      this.emit('ready', newTasks);
+    }
+  }
+
+  /**
+   * Resolve saat ada task baru yang ready (tanpa polling).
+   * timeoutMs: resolve dengan [] jika tidak ada task baru sebelum timeout
+   */
+  waitForReady(timeoutMs = null) {
+    return new Promise(resolve => {
+      let timer = null;
+      const onReady = (tasks) => {
+        if (timer) clearTimeout(timer);
+        resolve(tasks);
+      };
+
+      this.once('ready', onReady);
+      if (timeoutMs !== null) {
+        timer = setTimeout(() => {
+          this.removeListener('ready', onReady);
+          resolve([]);
+        }, timeoutMs);
+      }
+    });
+  }
+}
+
+module.exports = {
+  PlanWatcher
+};
@@ -0,0 +1,341 @@
+/**
+ * Content-addressed result cache untuk AI calls (breakdown, task, validation)
+ *
+ * Key = sha256 dari jenis call + prompt + isi file yang direferensikan prompt
+ * (plan / structure / schema). Jika prompt dan input nya tidak berubah,
+ * hasil sebelumnya dipakai ulang tanpa query() baru. Output task hanya
+ * disimpan sebagai checkpoint sampai validation selesai (lihat helpers.js).
+ *
+ * Disimpan di .ai/brain/cache/<key>.json dengan index.json untuk TTL dan
+ * LRU eviction (dibatasi jumlah entry dan total ukuran).
+ *
+ * Runner dan breakdown bisa memakai cache bersamaan: perubahan index dicatat
+ * per key lalu di-merge ke index.json terbaru di bawah lock file, jadi entry
+ * milik process lain tidak hilang. Update lastAccess dari get() di-batch.
+ */
+
+const crypto = require('crypto');
+const fs = require('fs');
+const path = require('path');
+
+const AI_DIR = path.join(__dirname, '..');
+const CACHE_DIR = path.join(AI_DIR, 'brain', 'cache');
+
+const DEFAULT_TTL = 7 * 24 * 60 * 60 * 1000; // 7 hari
+const DEFAULT_MAX_ENTRIES = 500;
+const DEFAULT_MAX_BYTES = 50 * 1024 * 1024; // 50 MB
+const SAVE_DELAY_MS = 1000; // batch update lastAccess dari get()
+const LOCK_TIMEOUT_MS = 5000;
+const LOCK_STALE_MS = 10000;
+const ORPHAN_AGE_MS = 10 * 60 * 1000; // Entry file tanpa index lebih tua dari ini dihapus
+
+function sleepSync(ms) {
+    Atomics.wait(new Int32Array(new SharedArrayBuffer(4)), 0, 0, ms);
+}
+
+function readFileOrNull(filePath) {
+    try {
+        return fs.readFileSync(filePath);
+    } catch {
+        return null;
+    }
+}
+
+class ResultCache {
+    constructor({
+        cacheDir = CACHE_DIR,
+        ttl = DEFAULT_TTL,
+        maxEntries = DEFAULT_MAX_ENTRIES,
+        maxBytes = DEFAULT_MAX_BYTES,
+        enabled = true
+    } = {}) {
+        this.cacheDir = cacheDir;
+        this.indexFile = path.join(cacheDir, 'index.json');
+        this.lockFile = path.join(cacheDir, 'index.lock');
+        this.ttl = ttl;
+        this.maxEntries = maxEntries;
+        this.maxBytes = maxBytes;
+        this.enabled = enabled;
+        this.index = null;
+        this.changes = new Map(); // key → meta (upsert) atau null (hapus), belum di-merge ke disk
+        this.saveTimer = null;
+        this.exitHookInstalled = false;
+        this.stats = { hits: 0, misses: 0, writes: 0, evictions: 0 };
+    }
+
+    /**
+     * Hash prompt + isi file referensi (+ extra context seperti task entry)
+     */
+    computeKey(kind, prompt, files = [], extra = null) {
+        const hash = crypto.createHash('sha256');
+        hash.update(`${kind}\0${prompt}\0`);
+
+        files.forEach(filePath => {
+            const content = readFileOrNull(filePath);
+            hash.update(`${path.relative(AI_DIR, filePath)}\0`);
+            hash.update(content === null ? '<missing>' : content);
+            hash.update('\0');
+        });
+
+        if (extra !== null && extra !== undefined) {
+            hash.update(JSON.stringify(extra));
+        }
+
+        return hash.digest('hex');
+    }
+
+    readIndexFile() {
+        try {
+            return JSON.parse(fs.readFileSync(this.indexFile, 'utf8'));
+        } catch {
+            return {};
+        }
+    }
+
+    loadIndex() {
+        if (!this.index) {
+            this.index = this.readIndexFile();
+        }
+        return this.index;
+    }
+
+    acquireLock() {
+        const deadline = Date.now() + LOCK_TIMEOUT_MS;
+
+        while (true) {
+            try {
+                fs.closeSync(fs.openSync(this.lockFile, 'wx'));
+                return true;
+            } catch (error) {
+                if (error.code !== 'EEXIST') throw error;
+
+                try {
+                    if (Date.now() - fs.statSync(this.lockFile).mtimeMs > LOCK_STALE_MS) {
+                        fs.unlinkSync(this.lockFile); // Lock dari process yang crash
+                        continue;
+                    }
+                } catch {
+                    continue; // Lock baru saja dilepas
+                }
+
+                if (Date.now() > deadline) return false;
+                sleepSync(20);
+            }
+        }
+    }
+
+    releaseLock() {
+        try {
+            fs.unlinkSync(this.lockFile);
+        } catch {
+            // Sudah dilepas
+        }
+    }
+
+    /**
+     * Merge perubahan lokal ke index.json terbaru (di bawah lock), evict, lalu tulis atomic
+     */
+    saveIndex() {
+        if (this.saveTimer) {
+            clearTimeout(this.saveTimer);
+            this.saveTimer = null;
+        }
+        if (this.changes.size === 0) return;
+
+        const tmpPath = `${this.indexFile}.${process.pid}.tmp`;
+        try {
+            fs.mkdirSync(this.cacheDir, { recursive: true });
+            if (!this.acquireLock()) {
+                console.warn('⚠️  Cache index is locked by another process, save postponed');
+                this.scheduleSave();
+                return;
+            }
+
+            try {
+                const index = this.readIndexFile();
+                for (const [key, meta] of this.changes) {
+                    if (meta === null) {
+                        delete index[key];
+                    } else if (index[key] && index[key].createdAt === meta.createdAt) {
+                        index[key].lastAccess = Math.max(index[key].lastAccess, meta.lastAccess);
+                    } else {
+                        index[key] = meta;
+                    }
+                }
+
+                this.index = index;
+                this.evict();
+                this.removeOrphans();
+
+                fs.writeFileSync(tmpPath, JSON.stringify(this.index), 'utf8');
+                fs.renameSync(tmpPath, this.indexFile);
+                this.changes.clear();
+            } finally {
+                this.releaseLock();
+            }
+        } catch (error) {
+            console.warn(`⚠️  Failed to save cache index: ${error.message}`);
+        }
+    }
+
+    scheduleSave() {
+        if (!this.exitHookInstalled) {
+            this.exitHookInstalled = true;
+            process.once('exit', () => this.saveIndex());
+        }
+        if (this.saveTimer) return;
+
+        this.saveTimer = setTimeout(() => {
+            this.saveTimer = null;
+            this.saveIndex();
+        }, SAVE_DELAY_MS);
+        this.saveTimer.unref();
+    }
+
+    /**
+     * Entry file yang tidak ada di index (mis. index tertimpa versi lama) tidak pernah
+     * ikut eviction; hapus jika sudah cukup lama supaya write process lain tidak ikut terhapus
+     */
+    removeOrphans() {
+        const now = Date.now();
+        let fileNames = [];
+        try {
+            fileNames = fs.readdirSync(this.cacheDir);
+        } catch {
+            return;
+        }
+
+        fileNames.forEach(fileName => {
+            if (!/^[0-9a-f]{64}\.json$/.test(fileName)) return;
+            if (this.index[fileName.slice(0, -5)]) return;
+
+            const filePath = path.join(this.cacheDir, fileName);
+            try {
+                if (now - fs.statSync(filePath).mtimeMs > ORPHAN_AGE_MS) {
+                    fs.unlinkSync(filePath);
+                    this.stats.evictions++;
+                }
+            } catch {
+                // File sudah dihapus process lain
+            }
+        });
+    }
+
+    entryPath(key) {
+        return path.join(this.cacheDir, `${key}.json`);
+    }
+
+    removeEntry(key) {
+        delete this.index[key];
+        this.changes.set(key, null);
+        try {
+            fs.unlinkSync(this.entryPath(key));
+        } catch {
+            // Entry file mungkin sudah tidak ada
+        }
+    }
+
+    get(key) {
+        if (!this.enabled) return null;
+
+        const index = this.loadIndex();
+        const meta = index[key];
+
+        if (!meta || Date.now() - meta.createdAt > this.ttl) {
+            if (meta) {
+                this.removeEntry(key);
+                this.scheduleSave();
+            }
+            this.stats.misses++;
+            return null;
+        }
+
+        const content = readFileOrNull(this.entryPath(key));
+        if (content === null) {
+            this.removeEntry(key);
+            this.scheduleSave();
+            this.stats.misses++;
+            return null;
+        }
+
+        meta.lastAccess = Date.now();
+        this.changes.set(key, meta);
+        this.scheduleSave();
+        this.stats.hits++;
+
+        try {
+            return JSON.parse(content.toString('utf8'));
+        } catch {
+            return null;
+        }
+    }
+
+    set(key, value) {
+        if (!this.enabled) return;
+
+        const index = this.loadIndex();
+        const content = JSON.stringify(value);
+        const now = Date.now();
+
+        try {
+            fs.mkdirSync(this.cacheDir, { recursive: true });
+            fs.writeFileSync(this.entryPath(key), content, 'utf8');
+        } catch (error) {
+            console.warn(`⚠️  Failed to write cache entry: ${error.message}`);
+            return;
+        }
+
+        index[key] = { createdAt: now, lastAccess: now, size: Buffer.byteLength(content) };
+        this.changes.set(key, index[key]);
+        this.stats.writes++;
+        this.saveIndex();
+    }
+
+    delete(key) {
+        if (!this.enabled || !this.loadIndex()[key]) return;
+
+        this.removeEntry(key);
+        this.scheduleSave();
+    }
+
+    /**
+     * Buang entry expired, lalu least-recently-used sampai di bawah batas entry & ukuran
+     */
+    evict() {
+        const index = this.loadIndex();
+        const now = Date.now();
+
+        Object.keys(index).forEach(key => {
+            if (now - index[key].createdAt > this.ttl) {
+                this.removeEntry(key);
+                this.stats.evictions++;
+            }
+        });
+
+        const keys = Object.keys(index).sort((a, b) => index[a].lastAccess - index[b].lastAccess);
+        let totalBytes = keys.reduce((sum, key) => sum + (index[key].size || 0), 0);
+        let count = keys.length;
+
+        for (const key of keys) {
+            if (count <= this.maxEntries && totalBytes <= this.maxBytes) break;
+            totalBytes -= index[key].size || 0;
+            count--;
+            this.removeEntry(key);
+            this.stats.evictions++;
+        }
+    }
+
+    getStats() {
+        return { enabled: this.enabled, ...this.stats };
+    }
+}
+
+// Shared instance untuk helpers.js dan plan-breakdown-analyzer.js
+const resultCache = new ResultCache();
+
+module.exports = {
+    AI_DIR,
+    CACHE_DIR,
+    ResultCache,
+    resultCache
+};
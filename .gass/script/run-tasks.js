@@ -1,17 +1,21 @@
 #!/usr/bin/env node
 
-const { spawn } = require('child_process');
-const fs = require('fs');
 const path = require('path');
 const {
-    parseTaskOutput,
-    executeCommand,
-    updateTaskStatus,
     runClaudeTask,
     runValidation,
     filterTasks,
     displaySummary
 } = require('./helpers');
+const { getAllLeafTasks } = require('./get-leaf-tasks');
+const { PLAN_DIR, loadPlanGraph } = require('./plan-graph');
+const { TaskScheduler } = require('./task-scheduler');
+const { resultCache } = require('./result-cache');
+const { PlanWatcher } = require('./plan-watcher');
+const { statusStore } = require('./status-store');
+const { metrics, METRICS_FILE } = require('./metrics');
+
+const MAX_LOOP_BACKOFF_MS = 5 * 60 * 1000; // Batas backoff untuk pass tanpa progress
 
 /**
  * Run Tasks Script
@@ -29,7 +33,11 @@ class RunTasks {
         this.results = [];
         this.loopMode = false;
         this.loopDelay = 5000; // 5 seconds delay between loops
+        this.watchMode = false;
+        this.watcher = null;
         this.currentLoop = 0;
+        this.idlePasses = 0; // Pass berturut-turut tanpa task yang lolos validation
+        this.schedulerStats = null;
     }
 
     /**
@@ -41,7 +49,9 @@ class RunTasks {
             maxParallel: 5,
             filter: '',
             loop: false,
-            loopDelay: 5000
+            watch: false,
+            loopDelay: 5000,
+            metricsPort: null
         };
 
         // Check for loop mode
@@ -56,6 +66,36 @@ class RunTasks {
             if (lIndex !== -1) args.splice(lIndex, 1);
         }
 
+        // Check for watch mode (loop yang wake-up dari perubahan plan file, bukan polling)
+        const watchIndex = args.indexOf('--watch');
+        if (watchIndex !== -1) {
+            options.watch = true;
+            options.loop = true;
+            this.watchMode = true;
+            this.loopMode = true;
+            args.splice(watchIndex, 1);
+        }
+
+        // Check for cache bypass
+        const noCacheIndex = args.indexOf('--no-cache');
+        if (noCacheIndex !== -1) {
+            resultCache.enabled = false;
+            args.splice(noCacheIndex, 1);
+        }
+
+        // Check for metrics: JSONL file (default on) + optional Prometheus endpoint
+        const noMetricsIndex = args.indexOf('--no-metrics');
+        if (noMetricsIndex !== -1) {
+            metrics.enabled = false;
+            args.splice(noMetricsIndex, 1);
+        }
+
+        const metricsPortIndex = args.findIndex(arg => arg.startsWith('--metrics-port='));
+        if (metricsPortIndex !== -1) {
+            options.metricsPort = parseInt(args[metricsPortIndex].split('=')[1]);
+            args.splice(metricsPortIndex, 1);
+        }
+
         // Check for loop delay
         const delayIndex = args.findIndex(arg => arg.startsWith('--delay='));
         if (delayIndex !== -1) {
@@ -83,36 +123,71 @@ class RunTasks {
 
     
     /**
-     * Get leaf tasks using existing script
+     * Normalize leaf task dari plan graph ke format yang dipakai helpers
      */
-    async getLeafTasks() {
-        try {
-            const scriptPath = path.join(this.scriptDir, 'get-leaf-tasks.js');
-            const { stdout, stderr, code } = await executeCommand(this.projectRoot, 'node', [scriptPath]);
+    toRunnerTask(task) {
+        return {
+            ...task,
+            phaseId: task.id,
+            description: task.description || task.title || ''
+        };
+    }
 
-            if (code !== 0) {
-                throw new Error(`Script failed: ${stderr}`);
-            }
+    /**
+     * Plan graph terbaru: di watch mode hanya file yang berubah yang di-parse ulang
+     */
+    getPlanGraph() {
+        if (this.watcher) {
+            this.watcher.refresh();
+            return this.watcher.graph;
+        }
+        return loadPlanGraph(PLAN_DIR);
+    }
 
-            const tasks = parseTaskOutput(stdout);
-            return tasks;
+    /**
+     * Get ready leaf tasks from the in-memory plan graph
+     */
+    async getLeafTasks(graph = loadPlanGraph(PLAN_DIR)) {
+        try {
+            return getAllLeafTasks(graph).map(task => this.toRunnerTask(task));
         } catch (error) {
             console.error('❌ Error getting leaf tasks:', error.message);
             throw error;
         }
     }
 
-    
+    /**
+     * Get all pending leaf tasks, including ones still blocked by dependencies
+     */
+    getPendingLeafTasks(graph) {
+        return graph.getPendingLeafTasks().map(task => this.toRunnerTask(task));
+    }
+
     /**
      * Run Claude with task description
+     * info dari scheduler: queue wait dan jumlah task running/queued saat start
      */
-    async runClaudeTask(task) {
+    async runClaudeTask(task, info = {}) {
         this.runningTasks.add(task.id);
-        this.completedTasks++;
+        metrics.increment('tasks_started_total');
+        metrics.setGauge('tasks_running', this.runningTasks.size);
+        if (info.queued !== undefined) {
+            metrics.setGauge('tasks_queued', info.queued);
+        }
+        if (info.queueWait !== undefined) {
+            metrics.recordSpan('queue_wait', info.queueWait, { taskId: task.id, running: info.running });
+        }
 
+        const span = metrics.startSpan('task_total', { taskId: task.id });
         const result = await runClaudeTask(this.scriptDir, this.projectRoot, task);
+        span.end({ ok: result.success, validated: result.validationPassed });
 
         this.runningTasks.delete(task.id);
+        this.completedTasks++;
+        metrics.setGauge('tasks_running', this.runningTasks.size);
+        metrics.increment('tasks_finished_total', {
+            result: result.validationPassed ? 'validated' : result.success ? 'needs_revision' : 'failed'
+        });
         console.log(`🏁 Task ${task.id} execution completed (${this.completedTasks}/${this.totalTasks})`);
 
         return result;
@@ -121,44 +196,38 @@ class RunTasks {
     /**
      * Run validation for completed task
      */
-    async runValidation(task) {
-        return await runValidation(this.scriptDir, this.projectRoot, task);
+    async runValidation(task, outputHash = null) {
+        return await runValidation(this.scriptDir, this.projectRoot, task, outputHash);
     }
 
     /**
      * Run tasks in parallel with limit
+     * Ready queue event-driven: task yang ter-unblock langsung di-start saat slot kosong
      */
-    async runTasksInParallel(tasks) {
-        const results = [];
-        let taskIndex = 0;
-
-        // Process tasks in batches
-        const processBatch = async () => {
-            while (taskIndex < tasks.length && this.runningTasks.size < this.maxParallel) {
-                const task = tasks[taskIndex++];
-                const promise = this.runClaudeTask(task);
-                results.push(promise);
-            }
-        };
-
-        // Start initial batch
-        await processBatch();
-
-        // Continue processing as tasks complete
-        while (this.runningTasks.size > 0) {
-            await new Promise(resolve => setTimeout(resolve, 2000)); // Check every 2 seconds
-            await processBatch();
-        }
-
-        // Wait for all remaining tasks
-        return Promise.all(results);
+    async runTasksInParallel(tasks, graph) {
+        const scheduler = new TaskScheduler({
+            graph,
+            tasks,
+            maxParallel: this.maxParallel,
+            runTask: (task, info) => this.runClaudeTask(task, info)
+        });
+
+        metrics.setGauge('max_parallel', this.maxParallel);
+        const results = await scheduler.run();
+        this.schedulerStats = scheduler.getStats();
+
+        metrics.setGauge('scheduler_utilization', this.schedulerStats.utilization);
+        metrics.setGauge('scheduler_saturation', this.schedulerStats.saturation);
+        metrics.setGauge('scheduler_makespan_seconds', this.schedulerStats.makespan / 1000);
+        metrics.writeSummary({ scheduler: this.schedulerStats });
+        return results;
     }
 
     /**
      * Display execution summary
      */
     showSummary(results, startTime) {
-        displaySummary(results, this.totalTasks, startTime);
+        displaySummary(results, this.totalTasks, startTime, this.schedulerStats);
     }
 
     /**
@@ -166,7 +235,14 @@ class RunTasks {
      */
     async runSingle(options, startTime) {
         console.log('🔍 Getting leaf tasks...');
-        const tasks = await this.getLeafTasks();
+        metrics.startPass();
+        const discoverySpan = metrics.startSpan('discovery');
+        // Terapkan journal ke phase files dulu, jika tidak transition yang belum
+        // di-compact membuat task yang sudah selesai terlihat ready lagi
+        statusStore.compact();
+        const graph = this.getPlanGraph();
+        const tasks = await this.getLeafTasks(graph);
+        discoverySpan.end({ ok: true, readyTasks: tasks.length });
 
         if (tasks.length === 0) {
             console.log('ℹ️  No tasks found to execute.');
@@ -187,17 +263,22 @@ class RunTasks {
             return { hasTasks: false, results: [] };
         }
 
-        // Sort by priority
-        filteredTasks.sort((a, b) => a.priority - b.priority);
+        // Blocked tasks ikut di-schedule, start otomatis begitu dependencies nya completed
+        const pendingTasks = filterTasks(this.getPendingLeafTasks(graph), options.filter);
 
-        this.totalTasks = filteredTasks.length;
+        this.totalTasks = pendingTasks.length;
+        this.completedTasks = 0;
         console.log(`🚀 Starting parallel execution (max ${this.maxParallel} concurrent tasks)...`);
+        console.log(`   ${filteredTasks.length} ready, ${pendingTasks.length - filteredTasks.length} waiting on dependencies`);
         console.log('─'.repeat(70));
 
-        const results = await this.runTasksInParallel(filteredTasks);
+        const results = await this.runTasksInParallel(pendingTasks, graph);
+
+        // Flush status journal ke phase files sebelum loop berikutnya scan ulang plan
+        statusStore.compact();
         this.showSummary(results, startTime);
 
-        return { hasTasks: true, results, taskCount: filteredTasks.length };
+        return { hasTasks: true, results, taskCount: results.length };
     }
 
     /**
@@ -206,8 +287,20 @@ class RunTasks {
     async run(options) {
         const overallStartTime = Date.now();
         this.currentLoop = 0;
-        let totalResults = [];
-        let totalTasksProcessed = 0;
+        this.resetLoopTotals();
+
+        if (options.metricsPort) {
+            metrics.startServer(options.metricsPort);
+            console.log(`📈 Metrics endpoint: http://127.0.0.1:${options.metricsPort}/metrics`);
+        }
+        if (metrics.enabled) {
+            console.log(`📝 Metrics: ${METRICS_FILE}`);
+        }
+
+        if (this.watchMode) {
+            this.watcher = new PlanWatcher(PLAN_DIR).start();
+            console.log(`👀 Watch mode enabled: waking up on plan changes in ${PLAN_DIR}`);
+        }
 
         if (this.loopMode) {
             console.log(`🔄 Infinite loop mode enabled (${this.loopDelay/1000}s delay)`);
@@ -232,7 +325,7 @@ class RunTasks {
                     if (this.loopMode) {
                         console.log('\n⏳ No tasks available now. Waiting before checking again...');
                         console.log('💤 Sleep mode - checking for new tasks...');
-                        await this.delay(this.loopDelay);
+                        await this.waitForTasks();
                         continue; // Continue the loop instead of breaking
                     } else {
                         console.log('\n✅ No more tasks available. Stopping execution.');
@@ -240,12 +333,10 @@ class RunTasks {
                     }
                 }
 
-                totalResults.push(...result.results);
-                totalTasksProcessed += result.taskCount;
+                this.recordLoopResults(result.results);
 
                 if (this.loopMode) {
-                    console.log(`\n⏳ Waiting ${this.loopDelay/1000}s before next loop...`);
-                    await this.delay(this.loopDelay);
+                    await this.waitAfterPass(result.results);
                 }
 
             } catch (error) {
@@ -263,8 +354,50 @@ class RunTasks {
 
         // Final summary for loop mode
         if (this.loopMode) {
-            this.showLoopSummary(totalResults, totalTasksProcessed, overallStartTime);
+            this.showLoopSummary(overallStartTime);
         }
+
+        await metrics.close();
+    }
+
+    /**
+     * Jeda setelah pass yang punya tasks.
+     * Ada progress (task lolos validation) di watch mode → langsung pass berikutnya,
+     * karena task yang ter-unblock selama pass ini sudah di-emit watcher.
+     * Tanpa progress → backoff eksponensial dari loopDelay, supaya task yang terus
+     * gagal tidak dijalankan ulang tanpa henti; di watch mode perubahan plan
+     * tetap membangunkan loop lebih awal.
+     */
+    async waitAfterPass(results) {
+        const progressed = results.some(result => result.validationPassed);
+        this.idlePasses = progressed ? 0 : this.idlePasses + 1;
+
+        if (progressed && this.watcher) {
+            return;
+        }
+
+        const waitMs = Math.min(this.loopDelay * Math.pow(2, Math.max(0, this.idlePasses - 1)), MAX_LOOP_BACKOFF_MS);
+        if (this.idlePasses > 0) {
+            console.log(`\n⏳ No task passed validation (idle pass #${this.idlePasses}), waiting ${waitMs/1000}s before next loop...`);
+        } else {
+            console.log(`\n⏳ Waiting ${waitMs/1000}s before next loop...`);
+        }
+
+        if (this.watcher) {
+            await this.watcher.waitForReady(waitMs);
+        } else {
+            await this.delay(waitMs);
+        }
+    }
+
+    /**
+     * Tunggu task baru: event dari plan watcher di watch mode, loopDelay jika tidak
+     */
+    waitForTasks() {
+        if (this.watcher) {
+            return this.watcher.waitForReady();
+        }
+        return this.delay(this.loopDelay);
     }
 
     /**
@@ -274,40 +407,74 @@ class RunTasks {
         return new Promise(resolve => setTimeout(resolve, ms));
     }
 
+    /**
+     * Reset counters untuk loop summary
+     */
+    resetLoopTotals() {
+        this.loopTotals = { tasksProcessed: 0, success: 0, failed: 0, validationPassed: 0 };
+        this.failedTasks = new Map();
+        this.revisionTasks = new Map();
+    }
+
+    /**
+     * Akumulasi hasil satu loop ke counters; transcript tidak disimpan antar loop.
+     * failedTasks / revisionTasks di-key per task ID, jadi ukurannya dibatasi jumlah task di plan.
+     */
+    recordLoopResults(results) {
+        results.forEach(result => {
+            const taskId = result.task.id;
+            this.loopTotals.tasksProcessed++;
+
+            if (result.success) {
+                this.loopTotals.success++;
+                this.failedTasks.delete(taskId);
+            } else {
+                this.loopTotals.failed++;
+                this.failedTasks.set(taskId, (result.error || 'Unknown error').substring(0, 200));
+            }
+
+            if (result.validationPassed) {
+                this.loopTotals.validationPassed++;
+                this.revisionTasks.delete(taskId);
+            } else if (result.success) {
+                this.revisionTasks.set(taskId, result.task.description.substring(0, 50));
+            }
+        });
+    }
+
     /**
      * Show loop summary
      */
-    showLoopSummary(allResults, totalTasks, startTime) {
+    showLoopSummary(startTime) {
         const endTime = Date.now();
         const duration = ((endTime - startTime) / 1000).toFixed(2);
+        const totals = this.loopTotals;
 
         console.log('\n' + '='.repeat(70));
         console.log('🔄 INFINITE LOOP EXECUTION SUMMARY');
         console.log('='.repeat(70));
         console.log(`Total loops: ${this.currentLoop}`);
-        console.log(`Total tasks processed: ${totalTasks}`);
-        console.log(`Successful execution: ${allResults.filter(r => r.success).length}`);
-        console.log(`Failed execution: ${allResults.filter(r => !r.success).length}`);
-        console.log(`Validation passed: ${allResults.filter(r => r.validationPassed).length}`);
+        console.log(`Total tasks processed: ${totals.tasksProcessed}`);
+        console.log(`Successful execution: ${totals.success}`);
+        console.log(`Failed execution: ${totals.failed}`);
+        console.log(`Validation passed: ${totals.validationPassed}`);
         console.log(`Total duration: ${duration} seconds`);
         console.log(`Average per loop: ${(duration / this.currentLoop).toFixed(2)} seconds`);
         console.log('🔄 Loop stopped by user (Ctrl+C)');
 
-        // Show failed tasks across all loops
-        const failedTasks = allResults.filter(r => !r.success);
-        if (failedTasks.length > 0) {
+        // Show tasks that are still failing across all loops
+        if (this.failedTasks.size > 0) {
             console.log('\n❌ FAILED TASKS:');
-            failedTasks.forEach(result => {
-                console.log(`   Task ${result.task.id}: ${result.error || 'Unknown error'}`);
+            this.failedTasks.forEach((error, taskId) => {
+                console.log(`   Task ${taskId}: ${error}`);
             });
         }
 
-        // Show validation failures across all loops
-        const validationFailed = allResults.filter(r => r.success && !r.validationPassed);
-        if (validationFailed.length > 0) {
+        // Show tasks that still need revision across all loops
+        if (this.revisionTasks.size > 0) {
             console.log('\n⚠️  TASKS NEEDING REVISION:');
-            validationFailed.forEach(result => {
-                console.log(`   Task ${result.task.id}: ${result.task.description.substring(0, 50)}...`);
+            this.revisionTasks.forEach((description, taskId) => {
+                console.log(`   Task ${taskId}: ${description}...`);
             });
         }
 
@@ -0,0 +1,406 @@
+const fs = require('fs');
+const path = require('path');
+const { PLAN_DIR, loadPlanGraph, loadJSON } = require('./plan-graph');
+
+/**
+ * Crash-safe status store untuk phase files di .ai/plan
+ *
+ * Setiap transisi status di-append ke journal (.ai/brain/status/journal.jsonl)
+ * lalu secara periodik di-compact kembali ke phase JSON files:
+ * 1. journal di-rename ke *.compacting (append baru masuk ke journal baru)
+ * 2. hanya phase files yang disentuh journal (phase, children, ancestors) dibaca
+ *    ulang dari disk, lalu semua journal di-replay in-memory urut timestamp
+ *    (top-down ke children + cascade parent completion dalam satu pass)
+ * 3. hanya file yang berubah ditulis, via temp file + rename
+ * 4. file *.compacting dihapus
+ *
+ * Compaction dan append ke journal dijaga lock file yang sama, jadi beberapa
+ * runner paralel tidak saling menimpa update, dan append tidak pernah masuk ke
+ * journal yang sedang di-compact (lalu ikut terhapus). Replay bersifat
+ * idempotent, jadi crash di tengah compaction aman: journal yang tersisa
+ * di-replay ulang di compaction berikutnya.
+ */
+
+const STATUS_DIR = path.join(__dirname, '..', 'brain', 'status');
+const JOURNAL_FILE = 'journal.jsonl';
+const COMPACT_EVERY = 50; // transisi
+const COMPACT_DELAY_MS = 200;
+const LOCK_TIMEOUT_MS = 5000;
+const LOCK_STALE_MS = 10000;
+
+function sleepSync(ms) {
+  Atomics.wait(new Int32Array(new SharedArrayBuffer(4)), 0, 0, ms);
+}
+
+function writeFileAtomic(filePath, content) {
+  const tmpPath = `${filePath}.${process.pid}.tmp`;
+  fs.writeFileSync(tmpPath, content, 'utf8');
+  fs.renameSync(tmpPath, filePath);
+}
+
+function readJournal(filePath) {
+  let content;
+  try {
+    content = fs.readFileSync(filePath, 'utf8');
+  } catch {
+    return [];
+  }
+
+  const transitions = [];
+  content.split('\n').forEach(line => {
+    if (!line.trim()) return;
+    try {
+      transitions.push(JSON.parse(line));
+    } catch {
+      // Baris terakhir bisa terpotong jika process crash saat append, abaikan
+    }
+  });
+  return transitions;
+}
+
+class StatusStore {
+  constructor({
+    planDir = PLAN_DIR,
+    statusDir = STATUS_DIR,
+    compactEvery = COMPACT_EVERY,
+    compactDelayMs = COMPACT_DELAY_MS
+  } = {}) {
+    this.planDir = planDir;
+    this.statusDir = statusDir;
+    this.journalPath = path.join(statusDir, JOURNAL_FILE);
+    this.lockPath = path.join(statusDir, 'journal.lock');
+    this.compactEvery = compactEvery;
+    this.compactDelayMs = compactDelayMs;
+
+    this.graph = null;
+    this.pending = 0;
+    this.timer = null;
+  }
+
+  getGraph() {
+    if (!this.graph) {
+      this.graph = this.loadState().graph;
+    }
+    return this.graph;
+  }
+
+  /**
+   * Phase files + replay semua journal yang belum di-compact
+   */
+  loadState() {
+    const graph = loadPlanGraph(this.planDir);
+    const dirty = new Set();
+
+    this.readPendingTransitions().forEach(transition => {
+      this.applyTransition(graph, transition, dirty, []);
+    });
+
+    return { graph, dirty };
+  }
+
+  /**
+   * Transisi dari semua journal (termasuk milik process lain), urut timestamp
+   */
+  readPendingTransitions() {
+    const journals = this.listCompactingJournals().concat(this.journalPath);
+    const transitions = [];
+    journals.forEach(journalPath => transitions.push(...readJournal(journalPath)));
+
+    // Sort stable: transisi dengan ts sama tetap urut sesuai journal
+    return transitions.sort((a, b) => (a.ts || '').localeCompare(b.ts || ''));
+  }
+
+  /**
+   * Phase files yang bisa berubah oleh transisi: phase + descendants + ancestors
+   */
+  getAffectedFiles(graph, transitions) {
+    const affected = new Set();
+
+    transitions.forEach(({ phase }) => {
+      const stack = [phase.toString()];
+      while (stack.length > 0) {
+        const phaseId = stack.pop();
+        if (!graph.hasPhaseFile(phaseId) || affected.has(phaseId)) continue;
+        affected.add(phaseId);
+        stack.push(...graph.getChildren(phaseId));
+      }
+
+      const visited = new Set();
+      let parentId = graph.getParentId(phase.toString());
+      while (parentId && !visited.has(parentId)) {
+        visited.add(parentId);
+        if (graph.hasPhaseFile(parentId)) affected.add(parentId);
+        parentId = graph.getParentId(parentId);
+      }
+    });
+
+    return affected;
+  }
+
+  /**
+   * Baca ulang phase files dari disk (bisa sudah diubah process lain)
+   */
+  reloadFiles(graph, phaseIds) {
+    phaseIds.forEach(phaseId => {
+      const filePath = graph.getFilePath(phaseId);
+      if (!fs.existsSync(filePath)) {
+        graph.removePhaseFile(phaseId);
+        return;
+      }
+
+      const data = loadJSON(filePath);
+      if (data) {
+        graph.setPhaseFile(phaseId, data, filePath);
+      }
+    });
+  }
+
+  listCompactingJournals() {
+    try {
+      return fs.readdirSync(this.statusDir)
+        .filter(fileName => fileName.startsWith(`${JOURNAL_FILE}.`) && fileName.endsWith('.compacting'))
+        .sort()
+        .map(fileName => path.join(this.statusDir, fileName));
+    } catch {
+      return [];
+    }
+  }
+
+  hasPhase(phaseId) {
+    const graph = this.getGraph();
+    return graph.hasPhaseFile(phaseId) || graph.entries.has(phaseId.toString());
+  }
+
+  /**
+   * Catat batch transisi [{ phase, status }] ke journal dan apply ke graph in-memory
+   * Return: daftar perubahan ({ id, file, from, to, auto }) untuk logging
+   */
+  record(transitions) {
+    const normalized = transitions
+      .map(transition => ({ phase: transition.phase.toString(), status: transition.status }));
+
+    // Phase baru (mis. hasil breakdown) belum ada di graph cache, reload sekali
+    if (this.graph && normalized.some(transition => !this.hasPhase(transition.phase))) {
+      this.graph = null;
+    }
+
+    const known = normalized.filter(transition => this.hasPhase(transition.phase));
+
+    if (known.length === 0) {
+      return [];
+    }
+
+    if (!this.acquireLock()) {
+      throw new Error('Status journal is locked by another process, transition not recorded');
+    }
+
+    try {
+      const ts = new Date().toISOString();
+      fs.appendFileSync(
+        this.journalPath,
+        known.map(transition => JSON.stringify({ ts, ...transition })).join('\n') + '\n',
+        'utf8'
+      );
+    } finally {
+      this.releaseLock();
+    }
+
+    const changes = [];
+    const graph = this.getGraph();
+    const visited = new Set(); // Satu batch: phase yang sudah ter-update lewat parent nya tidak diulang
+    known.forEach(transition => this.applyTransition(graph, transition, new Set(), changes, visited));
+
+    this.pending += known.length;
+    if (this.pending >= this.compactEvery) {
+      this.compact();
+    } else {
+      this.scheduleCompact();
+    }
+
+    return changes;
+  }
+
+  scheduleCompact() {
+    if (this.timer) return;
+    this.timer = setTimeout(() => {
+      this.timer = null;
+      try {
+        this.compact();
+      } catch (error) {
+        // Transitions tetap di journal, compaction berikutnya akan mencoba lagi
+        console.warn(`⚠️  Warning: Failed to compact status journal: ${error.message}`);
+      }
+    }, this.compactDelayMs);
+    // Journal tetap aman jika process keluar sebelum timer jalan
+    this.timer.unref();
+  }
+
+  /**
+   * Apply satu transisi: top-down ke phase + children, lalu cascade completion ke parent
+   */
+  applyTransition(graph, { phase, status }, dirty, changes, visited = new Set()) {
+    const phaseId = phase.toString();
+    if (!this.setStatusDown(graph, phaseId, status, dirty, changes, visited)) {
+      return false;
+    }
+
+    if (status === 'completed') {
+      this.cascadeCompletion(graph, phaseId, dirty, changes);
+    }
+    return true;
+  }
+
+  setStatusDown(graph, phaseId, status, dirty, changes, visited) {
+    const key = `${phaseId}:${status}`;
+    if (visited.has(key)) return true;
+    visited.add(key);
+
+    const data = graph.getPhaseData(phaseId);
+
+    if (data) {
+      changes.push({ id: phaseId, file: `${phaseId}.json`, from: data.status, to: status });
+      data.status = status;
+      (data.phases || []).forEach(subPhase => {
+        subPhase.status = status;
+      });
+      dirty.add(phaseId);
+
+      graph.getChildren(phaseId).forEach(childId => {
+        if (graph.hasPhaseFile(childId)) {
+          this.setStatusDown(graph, childId, status, dirty, changes, visited);
+        }
+      });
+    }
+
+    // Sinkronkan entry phase ini di file parent nya (satu-satunya tempat status leaf tanpa file)
+    const entry = graph.entries.get(phaseId);
+    const parentId = graph.getParentId(phaseId);
+    if (entry && parentId && graph.hasPhaseFile(parentId)) {
+      if (!data) {
+        changes.push({ id: phaseId, file: `${parentId}.json`, from: entry.status, to: status });
+      }
+      if (entry.status !== status) {
+        entry.status = status;
+        dirty.add(parentId);
+      }
+    } else if (!data) {
+      return false;
+    }
+
+    return true;
+  }
+
+  cascadeCompletion(graph, phaseId, dirty, changes) {
+    const visited = new Set([phaseId]);
+    let parentId = graph.getParentId(phaseId);
+
+    while (parentId && !visited.has(parentId)) {
+      visited.add(parentId);
+      const parentData = graph.getPhaseData(parentId);
+      if (!parentData || !Array.isArray(parentData.phases)) return;
+
+      const allChildrenCompleted = parentData.phases.every(child => (child.status || 'pending') === 'completed');
+      if (!allChildrenCompleted || parentData.status === 'completed') return;
+
+      changes.push({ id: parentId, file: `${parentId}.json`, from: parentData.status, to: 'completed', auto: true });
+      parentData.status = 'completed';
+      dirty.add(parentId);
+
+      const entry = graph.entries.get(parentId);
+      const grandParentId = graph.getParentId(parentId);
+      if (entry && grandParentId && graph.hasPhaseFile(grandParentId)) {
+        entry.status = 'completed';
+        dirty.add(grandParentId);
+      }
+
+      parentId = grandParentId;
+    }
+  }
+
+  acquireLock() {
+    const deadline = Date.now() + LOCK_TIMEOUT_MS;
+    fs.mkdirSync(this.statusDir, { recursive: true });
+
+    while (true) {
+      try {
+        fs.closeSync(fs.openSync(this.lockPath, 'wx'));
+        return true;
+      } catch (error) {
+        if (error.code !== 'EEXIST') throw error;
+
+        try {
+          if (Date.now() - fs.statSync(this.lockPath).mtimeMs > LOCK_STALE_MS) {
+            fs.unlinkSync(this.lockPath); // Lock dari process yang crash
+            continue;
+          }
+        } catch {
+          continue; // Lock baru saja dilepas
+        }
+
+        if (Date.now() > deadline) return false;
+        sleepSync(20);
+      }
+    }
+  }
+
+  releaseLock() {
+    try {
+      fs.unlinkSync(this.lockPath);
+    } catch {
+      // Sudah dilepas
+    }
+  }
+
+  /**
+   * Tulis semua transisi di journal ke phase files (atomic) dan kosongkan journal
+   * Return: jumlah phase file yang ditulis, atau -1 jika lock tidak didapat
+   */
+  compact() {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+
+    if (!this.acquireLock()) {
+      console.warn('⚠️  Status journal is locked by another process, compaction postponed');
+      this.scheduleCompact();
+      return -1;
+    }
+
+    try {
+      if (fs.existsSync(this.journalPath)) {
+        fs.renameSync(this.journalPath, path.join(this.statusDir, `${JOURNAL_FILE}.${Date.now()}.${process.pid}.compacting`));
+      }
+
+      const compacting = this.listCompactingJournals();
+      const transitions = this.readPendingTransitions();
+      const graph = this.getGraph();
+      const dirty = new Set();
+
+      // Tidak perlu load ulang seluruh plan: cukup file yang disentuh journal
+      this.reloadFiles(graph, this.getAffectedFiles(graph, transitions));
+      transitions.forEach(transition => this.applyTransition(graph, transition, dirty, []));
+
+      dirty.forEach(phaseId => {
+        writeFileAtomic(graph.getFilePath(phaseId), JSON.stringify(graph.getPhaseData(phaseId), null, 2));
+      });
+
+      compacting.forEach(journalPath => fs.unlinkSync(journalPath));
+
+      this.pending = 0;
+      return dirty.size;
+    } finally {
+      this.releaseLock();
+    }
+  }
+}
+
+// Shared instance untuk runner (helpers.updateTaskStatus) supaya transisi bisa di-batch
+const statusStore = new StatusStore();
+
+module.exports = {
+  STATUS_DIR,
+  StatusStore,
+  statusStore,
+  writeFileAtomic
+};
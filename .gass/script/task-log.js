@@ -0,0 +1,131 @@
+/**
+ * Streaming log per task untuk output Claude Agent SDK
+ *
+ * Setiap message SDK langsung di-append ke .ai/brain/log/<task>.jsonl
+ * (satu JSON per baris). Di memory hanya disimpan tail berukuran tetap dan
+ * keyword yang pernah muncul (untuk verdict validation), jadi task yang
+ * output nya panjang tidak membuat memory runner terus tumbuh.
+ */
+
+const crypto = require('crypto');
+const fs = require('fs');
+const path = require('path');
+
+const LOG_DIR = path.join(__dirname, '..', 'brain', 'log');
+const TAIL_SIZE = 4096; // chars
+
+function messageText(message) {
+    if (typeof message === 'string') {
+        return message;
+    }
+    if (message && message.content) {
+        return typeof message.content === 'string' ? message.content : JSON.stringify(message.content);
+    }
+    if (message && typeof message === 'object') {
+        return JSON.stringify(message);
+    }
+    return '';
+}
+
+class TaskLog {
+    /**
+     * @param {string|number} taskId - dipakai sebagai nama file log
+     * @param {string} stage - 'task' atau 'validation', ditulis di setiap baris
+     * @param {Object} options
+     * @param {string[]} options.keywords - keyword (lowercase) yang dilacak kemunculannya
+     */
+    constructor(taskId, stage, { logDir = LOG_DIR, tailSize = TAIL_SIZE, keywords = [] } = {}) {
+        const safeId = String(taskId).replace(/[^\w.-]/g, '_');
+
+        this.stage = stage;
+        this.filePath = path.join(logDir, `${safeId}.jsonl`);
+        this.tailSize = tailSize;
+        this.tail = '';
+        this.messageCount = 0;
+        this.charCount = 0;
+        this.digest = crypto.createHash('sha256');
+        this.hash = null;
+
+        this.keywords = keywords;
+        this.seenKeywords = new Set();
+        this.carryLength = Math.max(0, ...keywords.map(keyword => keyword.length)) - 1;
+        this.carry = '';
+
+        try {
+            fs.mkdirSync(logDir, { recursive: true });
+            this.stream = fs.createWriteStream(this.filePath, { flags: 'a' });
+            this.stream.on('error', (error) => {
+                console.warn(`⚠️  Failed to write task log ${this.filePath}: ${error.message}`);
+                this.stream = null;
+            });
+        } catch (error) {
+            console.warn(`⚠️  Failed to open task log ${this.filePath}: ${error.message}`);
+            this.stream = null;
+        }
+    }
+
+    /**
+     * Append satu message ke log file, return text nya (untuk progress callback)
+     */
+    write(message) {
+        const text = messageText(message);
+
+        if (this.stream) {
+            this.stream.write(JSON.stringify({
+                ts: new Date().toISOString(),
+                stage: this.stage,
+                message
+            }) + '\n');
+        }
+
+        this.messageCount++;
+        this.appendText(text);
+        return text;
+    }
+
+    appendText(text) {
+        if (!text) return;
+
+        this.charCount += text.length;
+        this.digest.update(text);
+        this.tail = (this.tail + text).slice(-this.tailSize);
+
+        if (this.keywords.length > 0) {
+            // Carry beberapa char terakhir supaya keyword yang terpotong antar chunk tetap terdeteksi
+            const haystack = this.carry + text.toLowerCase();
+            this.keywords.forEach(keyword => {
+                if (haystack.includes(keyword)) this.seenKeywords.add(keyword);
+            });
+            this.carry = this.carryLength > 0 ? haystack.slice(-this.carryLength) : '';
+        }
+    }
+
+    /**
+     * sha256 dari seluruh output run ini (bukan hanya tail), dipakai untuk cache key validation
+     */
+    getHash() {
+        if (!this.hash) {
+            this.hash = this.digest.digest('hex');
+        }
+        return this.hash;
+    }
+
+    hasKeyword(keyword) {
+        return this.seenKeywords.has(keyword);
+    }
+
+    close() {
+        return new Promise(resolve => {
+            if (!this.stream) return resolve();
+            this.stream.end(resolve);
+            this.stream = null;
+        });
+    }
+}
+
+module.exports = {
+    LOG_DIR,
+    TAIL_SIZE,
+    TaskLog,
+    messageText
+};
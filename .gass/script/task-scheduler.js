@@ -0,0 +1,278 @@
+/**
+ * Dependency-aware task scheduler untuk run-tasks.js
+ *
+ * Setiap pending leaf task punya in-degree = jumlah dependency yang belum completed.
+ * Task dengan in-degree 0 masuk priority queue (priority lalu ID). Begitu task
+ * selesai dan lolos validation, dependents nya di-decrement dan yang menjadi
+ * ready langsung di-start di slot yang kosong — tanpa polling dan tanpa rescan.
+ */
+
+const { compareTasks } = require('./plan-graph');
+
+/**
+ * Binary min-heap dengan comparator task (priority lalu ID)
+ */
+class ReadyQueue {
+    constructor(compare = compareTasks) {
+        this.compare = compare;
+        this.items = [];
+    }
+
+    get size() {
+        return this.items.length;
+    }
+
+    push(item) {
+        const items = this.items;
+        items.push(item);
+
+        let index = items.length - 1;
+        while (index > 0) {
+            const parent = (index - 1) >> 1;
+            if (this.compare(items[index], items[parent]) >= 0) break;
+            [items[index], items[parent]] = [items[parent], items[index]];
+            index = parent;
+        }
+    }
+
+    pop() {
+        const items = this.items;
+        if (items.length === 0) return undefined;
+
+        const top = items[0];
+        const last = items.pop();
+
+        if (items.length > 0) {
+            items[0] = last;
+            let index = 0;
+
+            while (true) {
+                const left = index * 2 + 1;
+                const right = left + 1;
+                let smallest = index;
+
+                if (left < items.length && this.compare(items[left], items[smallest]) < 0) smallest = left;
+                if (right < items.length && this.compare(items[right], items[smallest]) < 0) smallest = right;
+                if (smallest === index) break;
+
+                [items[index], items[smallest]] = [items[smallest], items[index]];
+                index = smallest;
+            }
+        }
+
+        return top;
+    }
+}
+
+class TaskScheduler {
+    /**
+     * @param {Object} options
+     * @param {PlanGraph} options.graph - plan graph untuk dependency & parent adjacency
+     * @param {Array} options.tasks - pending leaf tasks (boleh masih blocked)
+     * @param {number} options.maxParallel - jumlah slot paralel
+     * @param {Function} options.runTask - async (task, info) => result; result.validationPassed = completed.
+     *   info: { queueWait, running, queued } saat task di-start (untuk instrumentation)
+     */
+    constructor({ graph, tasks, maxParallel = 5, runTask }) {
+        this.graph = graph;
+        this.maxParallel = Math.max(1, maxParallel);
+        this.runTask = runTask;
+
+        this.tasks = new Map();
+        this.inDegree = new Map();
+        this.waiters = new Map();
+        this.remainingChildren = new Map();
+        this.completed = new Set();
+        this.queue = new ReadyQueue();
+
+        this.running = 0;
+        this.results = [];
+        this.timings = new Map();
+        this.readyAt = new Map();
+        this.chainTime = new Map();
+        this.busyTime = 0;
+        this.saturatedTime = 0;
+        this.lastChange = 0;
+        this.startTime = 0;
+        this.endTime = 0;
+
+        tasks.forEach(task => this.tasks.set(task.id.toString(), task));
+        this.seed();
+    }
+
+    isCompleted(phaseId) {
+        return this.completed.has(phaseId) || this.graph.getPhaseStatus(phaseId) === 'completed';
+    }
+
+    /**
+     * Hitung in-degree setiap task dan masukkan yang sudah ready ke queue
+     */
+    seed() {
+        for (const [taskId, task] of this.tasks) {
+            const unmet = (task.dependencies || [])
+                .map(depId => depId.toString())
+                .filter(depId => !this.isCompleted(depId));
+
+            this.inDegree.set(taskId, unmet.length);
+            unmet.forEach(depId => {
+                if (!this.waiters.has(depId)) {
+                    this.waiters.set(depId, []);
+                }
+                this.waiters.get(depId).push(taskId);
+            });
+
+            if (unmet.length === 0) {
+                this.enqueue(task);
+            }
+        }
+    }
+
+    enqueue(task) {
+        this.readyAt.set(task.id.toString(), Date.now());
+        this.queue.push(task);
+    }
+
+    /**
+     * Akumulasi waktu saat semua slot terpakai (saturation), dipanggil sebelum running berubah
+     */
+    trackSaturation() {
+        const now = Date.now();
+        if (this.running >= this.maxParallel) {
+            this.saturatedTime += now - this.lastChange;
+        }
+        this.lastChange = now;
+    }
+
+    get blockedCount() {
+        let blocked = 0;
+        for (const degree of this.inDegree.values()) {
+            if (degree > 0) blocked++;
+        }
+        return blocked;
+    }
+
+    /**
+     * Jalankan semua task yang bisa dijalankan, resolve saat queue kosong dan tidak ada yang running
+     */
+    run() {
+        this.startTime = Date.now();
+        this.lastChange = this.startTime;
+
+        return new Promise((resolve) => {
+            const pump = () => {
+                while (this.running < this.maxParallel && this.queue.size > 0) {
+                    this.start(this.queue.pop(), pump);
+                }
+
+                if (this.running === 0 && this.queue.size === 0) {
+                    this.endTime = Date.now();
+                    resolve(this.results);
+                }
+            };
+
+            pump();
+        });
+    }
+
+    start(task, pump) {
+        const taskId = task.id.toString();
+        const startedAt = Date.now();
+        const queueWait = startedAt - Math.max(this.readyAt.get(taskId) || startedAt, this.startTime);
+        this.trackSaturation();
+        this.running++;
+
+        Promise.resolve()
+            .then(() => this.runTask(task, { queueWait, running: this.running, queued: this.queue.size }))
+            .catch(error => ({
+                task,
+                success: false,
+                error: error.message,
+                validationPassed: false
+            }))
+            .then(result => {
+                const duration = Date.now() - startedAt;
+                this.trackSaturation();
+                this.running--;
+                this.busyTime += duration;
+                this.timings.set(taskId, duration);
+                this.results.push(result);
+
+                this.recordChain(task, duration);
+                if (result && result.validationPassed) {
+                    this.markCompleted(taskId);
+                }
+
+                pump();
+            });
+    }
+
+    /**
+     * Panjang rantai dependency terpanjang yang berakhir di task ini (ms)
+     */
+    recordChain(task, duration) {
+        const upstream = (task.dependencies || [])
+            .map(depId => this.chainTime.get(depId.toString()) || 0);
+        this.chainTime.set(task.id.toString(), duration + Math.max(0, ...upstream));
+    }
+
+    /**
+     * Tandai phase completed, unblock dependents, dan cascade ke parent
+     * jika semua children nya sudah completed
+     */
+    markCompleted(phaseId) {
+        if (this.completed.has(phaseId)) return;
+        this.completed.add(phaseId);
+
+        (this.waiters.get(phaseId) || []).forEach(taskId => {
+            const degree = this.inDegree.get(taskId) - 1;
+            this.inDegree.set(taskId, degree);
+            if (degree === 0) {
+                this.enqueue(this.tasks.get(taskId));
+            }
+        });
+        this.waiters.delete(phaseId);
+
+        const parentId = this.graph.getParentId(phaseId);
+        if (!parentId || this.completed.has(parentId)) return;
+
+        if (!this.remainingChildren.has(parentId)) {
+            const pending = this.graph.getChildren(parentId).filter(childId => !this.isCompleted(childId));
+            this.remainingChildren.set(parentId, pending.length);
+        } else {
+            this.remainingChildren.set(parentId, this.remainingChildren.get(parentId) - 1);
+        }
+
+        const parentChain = this.graph.getChildren(parentId)
+            .map(childId => this.chainTime.get(childId) || 0);
+        this.chainTime.set(parentId, Math.max(0, ...parentChain));
+
+        if (this.remainingChildren.get(parentId) === 0) {
+            this.markCompleted(parentId);
+        }
+    }
+
+    /**
+     * Statistik wall-clock: makespan vs critical path (batas bawah), utilisasi slot
+     * dan saturation (porsi makespan saat semua slot terpakai)
+     */
+    getStats() {
+        const makespan = (this.endTime || Date.now()) - this.startTime;
+        const criticalPath = Math.max(0, ...this.chainTime.values());
+        const capacity = makespan * this.maxParallel;
+
+        return {
+            executed: this.timings.size,
+            blocked: this.blockedCount,
+            makespan,
+            criticalPath,
+            totalWork: this.busyTime,
+            utilization: capacity > 0 ? this.busyTime / capacity : 0,
+            saturation: makespan > 0 ? this.saturatedTime / makespan : 0
+        };
+    }
+}
+
+module.exports = {
+    ReadyQueue,
+    TaskScheduler
+};
@@ -1,9 +1,8 @@
 #!/usr/bin/env node
 
-const fs = require('fs');
 const path = require('path');
-
-const PLAN_DIR = path.join(__dirname, '..', 'plan');
+const { PLAN_DIR, loadPlanGraph, loadJSON } = require('./plan-graph');
+const { StatusStore, writeFileAtomic } = require('./status-store');
 
 /**
  * CLI script untuk update status semua phase dalam direktori .ai/plan
@@ -11,6 +10,8 @@ const PLAN_DIR = path.join(__dirname, '..', 'plan');
  * Features:
  * - Top-down update: Update parent → semua children otomatis update
  * - Bottom-up update: Children completed → parent otomatis completed (cascade)
+ * - Semua transisi lewat StatusStore: journal append-only + compaction atomic
+ *   (lihat status-store.js), aman untuk beberapa runner yang update bersamaan
  *
  * Usage:
  *   node update-phase-status.js --status pending --all
@@ -37,19 +38,9 @@ Contoh:
 `);
 }
 
-function loadJSON(filePath) {
-  try {
-    const content = fs.readFileSync(filePath, 'utf8');
-    return JSON.parse(content);
-  } catch (error) {
-    console.error(`Error loading ${filePath}:`, error.message);
-    return null;
-  }
-}
-
 function saveJSON(filePath, data) {
   try {
-    fs.writeFileSync(filePath, JSON.stringify(data, null, 2), 'utf8');
+    writeFileAtomic(filePath, JSON.stringify(data, null, 2));
     return true;
   } catch (error) {
     console.error(`Error saving ${filePath}:`, error.message);
@@ -57,97 +48,45 @@ function saveJSON(filePath, data) {
   }
 }
 
-function getAllPhaseFiles() {
-  const files = fs.readdirSync(PLAN_DIR);
-  return files
-    .filter(file => file.endsWith('.json') && file !== 'phases.json')
-    .sort((a, b) => {
-      // Sort by phase ID numerically
-      const aId = a.replace('.json', '');
-      const bId = b.replace('.json', '');
-      return aId.localeCompare(bId, undefined, { numeric: true });
-    });
+function getAllPhaseFiles(graph = loadPlanGraph(PLAN_DIR)) {
+  return Array.from(graph.files.keys())
+    .sort((a, b) => a.localeCompare(b, undefined, { numeric: true })) // Sort by phase ID numerically
+    .map(phaseId => `${phaseId}.json`);
 }
 
-function updatePhaseStatus(phaseId, newStatus) {
-  const filePath = path.join(PLAN_DIR, `${phaseId}.json`);
-
-  if (!fs.existsSync(filePath)) {
-    console.log(`Phase file not found: ${phaseId}.json`);
-    return false;
-  }
-
-  const data = loadJSON(filePath);
-  if (!data) return false;
-
-  // Update status di phase utama
-  const oldStatus = data.status;
-  data.status = newStatus;
-
-  // Update status di semua sub-phases jika ada
-  if (data.phases && Array.isArray(data.phases)) {
-    data.phases.forEach(subPhase => {
-      subPhase.status = newStatus;
-    });
-  }
-
-  if (saveJSON(filePath, data)) {
-    console.log(`✓ ${phaseId}.json: ${oldStatus} → ${newStatus}`);
-
-    // Update sub-phases
-    if (data.phases && Array.isArray(data.phases)) {
-      data.phases.forEach(subPhase => {
-        updatePhaseStatus(subPhase.id, newStatus);
-      });
-    }
-
-    // Auto-update parent status if all children are completed
-    if (newStatus === 'completed') {
-      updateParentStatusIfAllChildrenCompleted(phaseId);
+function logChanges(changes) {
+  changes.forEach(change => {
+    if (change.auto) {
+      console.log(`🎯 AUTO-UPDATE: ${change.file}: ${change.from} → ${change.to} (all children completed)`);
+    } else if (change.file === `${change.id}.json`) {
+      console.log(`✓ ${change.file}: ${change.from} → ${change.to}`);
+    } else {
+      console.log(`✓ ${change.file} [${change.id}]: ${change.from} → ${change.to}`);
     }
-
-    return true;
-  }
-
-  return false;
+  });
 }
 
-function updateParentStatusIfAllChildrenCompleted(childPhaseId) {
-  // Extract parent phase ID (e.g., from "2.1.1" get "2.1", from "2.1" get "2")
-  const parts = childPhaseId.split('.');
-  if (parts.length <= 1) {
-    return; // No parent for main phases
-  }
-
-  const parentPhaseId = parts.slice(0, -1).join('.');
-
-  const parentFilePath = path.join(PLAN_DIR, `${parentPhaseId}.json`);
-  if (!fs.existsSync(parentFilePath)) {
-    return; // Parent file doesn't exist
-  }
+/**
+ * Update status phase + semua sub-phases nya, lalu cascade completion ke parent
+ *
+ * Option compact: false dipakai runner supaya transisi dari banyak task
+ * di-batch di journal dan ditulis ke phase files sekali per compaction.
+ */
+function updatePhaseStatus(phaseId, newStatus, store = new StatusStore(), { compact = true } = {}) {
+  const changes = store.record([{ phase: phaseId, status: newStatus }]);
 
-  const parentData = loadJSON(parentFilePath);
-  if (!parentData || !parentData.phases || !Array.isArray(parentData.phases)) {
-    return; // Parent has no phases to check
+  if (changes.length === 0) {
+    console.log(`Phase file not found: ${phaseId}.json`);
+    return false;
   }
 
-  // Check if all children are completed
-  const allChildrenCompleted = parentData.phases.every(child => {
-    const childStatus = child.status || 'pending';
-    return childStatus === 'completed';
-  });
-
-  if (allChildrenCompleted && parentData.status !== 'completed') {
-    const oldStatus = parentData.status;
-    parentData.status = 'completed';
+  logChanges(changes);
 
-    if (saveJSON(parentFilePath, parentData)) {
-      console.log(`🎯 AUTO-UPDATE: ${parentPhaseId}.json: ${oldStatus} → completed (all children completed)`);
-
-      // Recursively check parent's parent
-      updateParentStatusIfAllChildrenCompleted(parentPhaseId);
-    }
+  if (compact) {
+    store.compact();
   }
+
+  return true;
 }
 
 function listAllPhases() {
@@ -165,12 +104,12 @@ function listAllPhases() {
 
   // Load detailed phase files
   console.log('Detailed Phase Files:');
-  const files = getAllPhaseFiles();
+  const graph = loadPlanGraph(PLAN_DIR);
+  const files = getAllPhaseFiles(graph);
 
   files.forEach(file => {
     const phaseId = file.replace('.json', '');
-    const filePath = path.join(PLAN_DIR, file);
-    const data = loadJSON(filePath);
+    const data = graph.getPhaseData(phaseId);
 
     if (data) {
       const indent = phaseId.includes('.') ? '  └─ ' : '  ';
@@ -206,18 +145,21 @@ function updateAllPhases(newStatus) {
     }
   }
 
-  // Update all detailed phase files
-  const files = getAllPhaseFiles();
-  let successCount = 0;
+  // Update all detailed phase files: satu batch transisi, setiap file ditulis sekali.
+  // Tanpa compaction otomatis di dalam record(), supaya compact() di bawah
+  // melaporkan jumlah file yang benar-benar ditulis
+  const store = new StatusStore({ compactEvery: Infinity });
+  const phaseIds = getAllPhaseFiles(store.getGraph()).map(file => file.replace('.json', ''));
 
-  files.forEach(file => {
-    const phaseId = file.replace('.json', '');
-    if (updatePhaseStatus(phaseId, newStatus)) {
-      successCount++;
-    }
-  });
+  logChanges(store.record(phaseIds.map(phaseId => ({ phase: phaseId, status: newStatus }))));
+  const writtenCount = store.compact();
+
+  if (writtenCount < 0) {
+    console.warn('\n⚠️  Status journal is locked by another process: changes are journaled and will be written by the next compaction');
+    return;
+  }
 
-  console.log(`\n✓ Berhasil update ${successCount} phase files`);
+  console.log(`\n✓ Berhasil update ${writtenCount} phase files`);
 }
 
 function main() {
@@ -251,17 +193,24 @@ function main() {
     process.exit(1);
   }
 
-  if (allIndex !== -1) {
-    updateAllPhases(newStatus);
-  } else if (phaseIndex !== -1 && phaseIndex < args.length - 1) {
-    const phaseId = args[phaseIndex + 1];
-    console.log(`\n=== Mengupdate phase ${phaseId} ke status: ${newStatus} ===\n`);
-    updatePhaseStatus(phaseId, newStatus);
-  } else {
+  if (allIndex === -1 && (phaseIndex === -1 || phaseIndex === args.length - 1)) {
     console.error('Error: Please specify either --all or --phase <id>');
     showUsage();
     process.exit(1);
   }
+
+  try {
+    if (allIndex !== -1) {
+      updateAllPhases(newStatus);
+    } else {
+      const phaseId = args[phaseIndex + 1];
+      console.log(`\n=== Mengupdate phase ${phaseId} ke status: ${newStatus} ===\n`);
+      updatePhaseStatus(phaseId, newStatus);
+    }
+  } catch (error) {
+    console.error(`Error: ${error.message}`);
+    process.exit(1);
+  }
 }
 
 if (require.main === module) {